@@ -0,0 +1,39 @@
+"""
+Compares exact and approximate profiles of high cardinality columns
+
+Run from the repository root with ``python -m benchmarks.bench_cardinality``.
+Peak memory is measured with tracemalloc, which also sees the hash tables
+of pandas, on top of the dataframe itself.
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from prepropy.profile import Profile
+
+
+def main(n_rows=20_000_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"x": rng.normal(size=n_rows)})
+    df["session"] = rng.integers(0, n_rows // 2, size=n_rows)
+    df["user"] = rng.permutation(n_rows)
+    print(f"{n_rows} rows, {n_rows} distinct users")
+    print(f"{'profile':<14}{'seconds':>9}{'peak (MB)':>11}{'classes':>12}")
+    for name, approximate in [("exact", False), ("approximate", True)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        profile = Profile("user", approximate=approximate).update(df)
+        n_classes = profile.n_classes()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{name:<14}{seconds:>9.2f}{peak / 2 ** 20:>11.0f}"
+            f"{n_classes:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
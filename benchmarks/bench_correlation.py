@@ -0,0 +1,42 @@
+"""
+Compares the correlation report of eda() with pandas.DataFrame.corr()
+
+Run from the repository root with ``python -m benchmarks.bench_correlation``.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from prepropy.profile import Profile
+
+
+def timed(func):
+    """
+    Returns the result of func() and the seconds it took
+    """
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main(n_rows=20_000, n_cols=2000, missing=0.01):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+    df.columns = [f"x{i}" for i in range(n_cols)]
+    print(f"{n_rows} x {n_cols} float64 features")
+    print(f"{'method':<32}{'seconds':>9}{'max abs diff':>14}")
+    for name, frame in [
+        ("complete", df),
+        (f"{missing:.0%} missing", df.mask(rng.random(df.shape) < missing)),
+    ]:
+        expected, pandas_seconds = timed(frame.corr)
+        profile = Profile(correlation=True)
+        cor, seconds = timed(lambda: profile.update(frame).correlation())
+        diff = np.nanmax(np.abs(cor.to_numpy() - expected.to_numpy()))
+        print(f"{'pandas corr, ' + name:<32}{pandas_seconds:>9.2f}")
+        print(f"{'cross-products, ' + name:<32}{seconds:>9.2f}{diff:>14.1e}")
+
+
+if __name__ == "__main__":
+    main()
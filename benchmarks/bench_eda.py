@@ -0,0 +1,70 @@
+"""
+Compares eda() with the multi-pass implementation it replaced
+
+Run from the repository root with ``python -m benchmarks.bench_eda``. The
+previous implementation copies the features and builds two boolean masks,
+so main(n_rows=1_000_000) needs about 5 GB on top of the 2 GB frame; the
+default 500k rows fits on smaller machines.
+"""
+import functools
+import timeit
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from prepropy.eda import eda
+
+
+def eda_previous(df, target):
+    """
+    The statistics part of eda() before the single pass profile
+    """
+    res = {}
+    df_fea = df.drop(target, axis=1)
+    num_fea = df_fea.select_dtypes("number").columns.to_list()
+    cat_fea = list(set(list(df_fea.columns)) - set(num_fea))
+    key_null = list(df_fea.isnull().sum().index)
+    val_null = list(df_fea.isnull().sum().values)
+    res["nb_missing_values"] = list(zip(key_null, val_null))
+    res["nb_cat_features"] = len(cat_fea)
+    res["cat_features_name"] = cat_fea
+    res["nb_num_features"] = len(num_fea)
+    res["num_features_name"] = num_fea
+    res["nb_class"] = len(list(set(df[target])))
+    class_count = df[target].value_counts(normalize=True).values
+    res["class_ratio"] = list(class_count.round(4))
+    res["pairplot"] = (
+        alt.Chart(df)
+        .mark_circle()
+        .encode(
+            alt.X(alt.repeat("column"), type="quantitative"),
+            alt.Y(alt.repeat("row"), type="quantitative"),
+            color=target + ":N",
+        )
+        .properties(width=100, height=100)
+        .repeat(row=num_fea, column=num_fea)
+    )
+    return res
+
+
+def main(n_rows=500_000, n_cols=500, repeat=3):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        rng.standard_normal(size=(n_rows, n_cols), dtype=np.float32)
+    )
+    df.columns = [f"x{i}" for i in range(n_cols)]
+    df["cat"] = pd.Categorical(rng.choice(["a", "b", "c"], size=n_rows))
+    df["target"] = rng.integers(0, 5, size=n_rows)
+    print(f"{n_rows} x {n_cols} float32 features")
+    # the previous implementation computed no correlations
+    single = functools.partial(eda, cor=None)
+    for name, func in [("previous", eda_previous), ("single pass", single)]:
+        seconds = min(
+            timeit.repeat(lambda: func(df, "target"), number=1, repeat=repeat)
+        )
+        print(f"{name:<12}{seconds:>8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
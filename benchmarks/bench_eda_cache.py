@@ -0,0 +1,49 @@
+"""
+Measures repeated eda() calls with and without a result cache
+
+Run from the repository root with ``python -m benchmarks.bench_eda_cache``.
+"""
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from prepropy.cache import ResultCache, fingerprint
+from prepropy.eda import eda
+
+
+def timed(func):
+    """
+    Returns the seconds func() took
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(n_rows=200_000, n_cols=50):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+    df.columns = [f"x{i}" for i in range(n_cols)]
+    df["cat"] = rng.choice(["a", "b", "c"], size=n_rows)
+    df["target"] = rng.integers(0, 5, size=n_rows)
+    print(f"{n_rows} x {n_cols + 2}")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(path=tmp)
+        rows = [
+            ("no cache", lambda: eda(df, "target")),
+            ("first call", lambda: eda(df, "target", cache=cache)),
+            ("memory hit", lambda: eda(df, "target", cache=cache)),
+            (
+                "disk hit",
+                lambda: eda(df, "target", cache=ResultCache(path=tmp)),
+            ),
+            ("fingerprint only", lambda: fingerprint(df, "target")),
+        ]
+        for name, func in rows:
+            print(f"{name:<18}{timed(func) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Measures what reading one key of the lazy eda() result costs
+
+Run from the repository root with ``python -m benchmarks.bench_eda_lazy``.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from prepropy.eda import eda
+
+KEYS = ["nb_num_features", "class_ratio", "cor", "pairplot"]
+
+
+def main(n_rows=200_000, n_cols=200):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+    df.columns = [f"x{i}" for i in range(n_cols)]
+    df["cat"] = rng.choice(["a", "b", "c"], size=n_rows)
+    df["target"] = rng.integers(0, 5, size=n_rows)
+    print(f"{n_rows} x {n_cols + 2}")
+    print(f"{'first key read':<18}{'seconds':>9}")
+    for key in KEYS + ["every key"]:
+        start = time.perf_counter()
+        res = eda(df, "target")
+        if key == "every key":
+            dict(res)
+        else:
+            res[key]
+        print(f"{key:<18}{time.perf_counter() - start:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
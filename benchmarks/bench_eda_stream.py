@@ -0,0 +1,66 @@
+"""
+Compares eda() on a CSV file read whole with eda_stream() over its chunks
+
+Run from the repository root with ``python -m benchmarks.bench_eda_stream``.
+Each pass runs in a fresh interpreter so its peak RSS can be reported.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+PASSES = {
+    "read + eda": "eda(pd.read_csv(source), 'target')",
+    "eda_stream": "eda_stream(source, 'target', chunksize=chunksize)",
+    "eda_stream binned": (
+        "eda_stream(source, 'target', chunksize=chunksize, pairplot='binned')"
+    ),
+}
+
+
+def run_pass(source, chunksize, statement):
+    """
+    Returns the seconds and the peak RSS in MB of one pass over source
+    """
+    code = f"""
+import resource, time
+import pandas as pd
+from prepropy.eda import eda, eda_stream
+
+source, chunksize = {source!r}, {chunksize}
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    seconds, peak = out.stdout.split()
+    return float(seconds), float(peak)
+
+
+def main(n_rows=2_000_000, n_cols=10, chunksize=100_000):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.csv")
+        df = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+        df.columns = [f"x{i}" for i in range(n_cols)]
+        df["target"] = rng.integers(0, 5, size=n_rows)
+        df.to_csv(source, index=False)
+        size_mb = os.path.getsize(source) / 2 ** 20
+        del df
+        print(f"{n_rows} rows, {size_mb:.0f} MB of CSV, chunks of {chunksize}")
+        print(f"{'pass':<28}{'seconds':>9}{'peak RSS (MB)':>15}")
+        for name, statement in PASSES.items():
+            seconds, peak = run_pass(source, chunksize, statement)
+            print(f"{name:<28}{seconds:>9.2f}{peak:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
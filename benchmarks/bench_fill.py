@@ -0,0 +1,61 @@
+"""
+Compares imputation.fill against the former column-by-column fillna loop
+
+Run from the repository root with ``python -m benchmarks.bench_fill``.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from prepropy.imputation import imputation
+
+
+def loop_fill(values, data_for_fill):
+    """
+    The fill implementation prepropy shipped before the vectorized engine
+    """
+    data = data_for_fill.copy()
+    for i in range(len(data.columns)):
+        data.iloc[:, i].fillna(values[i], inplace=True)
+    return data
+
+
+def gen_data(n_rows, n_cols, nan_ratio=0.05, seed=0):
+    """
+    Generates a float dataframe with randomly placed missing values
+    """
+    rng = np.random.default_rng(seed)
+    arr = rng.random((n_rows, n_cols))
+    arr[rng.random((n_rows, n_cols)) < nan_ratio] = np.nan
+    return pd.DataFrame(arr)
+
+
+def main(repeat=3):
+    shapes = {"wide": (10_000, 2_000), "tall": (1_000_000, 10)}
+    print(f"{'shape':<6}{'loop (s)':>12}{'fill (s)':>12}{'in place (s)':>14}")
+    for name, (n_rows, n_cols) in shapes.items():
+        df = gen_data(n_rows, n_cols)
+        imputer = imputation("mean")
+        imputer.fit(df)
+        t_loop = min(
+            timeit.repeat(
+                lambda: loop_fill(imputer.values, df), number=1, repeat=repeat
+            )
+        )
+        t_fill = min(
+            timeit.repeat(lambda: imputer.fill(df), number=1, repeat=repeat)
+        )
+        copies = [df.copy() for _ in range(repeat)]
+        t_inplace = min(
+            timeit.repeat(
+                lambda: imputer.fill(copies.pop(), copy=False),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        print(f"{name:<6}{t_loop:>12.4f}{t_fill:>12.4f}{t_inplace:>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures how imputation.fit scales with n_jobs on a wide dataframe
+
+Run from the repository root with ``python -m benchmarks.bench_fit_parallel``.
+"""
+import os
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from prepropy.imputation import imputation
+
+
+def gen_data(n_rows, n_cols, seed=0):
+    """
+    Generates a wide dataframe of small integers with missing values
+    """
+    rng = np.random.default_rng(seed)
+    arr = rng.integers(0, 1_000, size=(n_rows, n_cols)).astype(float)
+    arr[rng.random((n_rows, n_cols)) < 0.05] = np.nan
+    return pd.DataFrame(arr)
+
+
+def main(n_rows=2_000, n_cols=10_000):
+    df = gen_data(n_rows, n_cols)
+    jobs = [1] + [n for n in (2, 4, 8) if n <= (os.cpu_count() or 1)]
+    print(f"{'method':<14}" + "".join(f"{f'n_jobs={n}':>12}" for n in jobs))
+    for method in ["mean", "median", "most_frequent"]:
+        times = [
+            min(
+                timeit.repeat(
+                    lambda: imputation(method, n_jobs=n).fit(df),
+                    number=1,
+                    repeat=3,
+                )
+            )
+            for n in jobs
+        ]
+        print(f"{method:<14}" + "".join(f"{t:>12.3f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
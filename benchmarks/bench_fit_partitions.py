@@ -0,0 +1,44 @@
+"""
+Times Scaler.fit_partitions over a directory of CSV partitions for several
+numbers of worker processes
+
+Run from the repository root with
+``python -m benchmarks.bench_fit_partitions``. The wall time only drops
+with more processes when that many cores are free.
+"""
+import os
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from prepropy.scaler import Scaler
+
+
+def main(n_partitions=8, n_rows=250_000, n_cols=10, repeat=3):
+    rng = np.random.default_rng(0)
+    features = [f"x{i}" for i in range(n_cols)]
+    print(f"{os.cpu_count()} cores, {n_partitions} partitions x {n_rows}")
+    with tempfile.TemporaryDirectory() as tmp:
+        parts = []
+        for i in range(n_partitions):
+            X = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+            X.columns = features
+            X.to_csv(os.path.join(tmp, f"part-{i:03d}.csv"), index=False)
+            parts.append(X)
+        whole = Scaler().fit(pd.concat(parts), features)
+        print(f"{'n_jobs':<8}{'seconds':>9}{'max |scale diff|':>18}")
+        for n_jobs in [1, 2, 4]:
+            times = timeit.repeat(
+                lambda: Scaler().fit_partitions(tmp, features, n_jobs),
+                number=1,
+                repeat=repeat,
+            )
+            sc = Scaler().fit_partitions(tmp, features, n_jobs)
+            diff = np.max(np.abs(sc.scale_ - whole.scale_))
+            print(f"{n_jobs:<8}{min(times):>9.2f}{diff:>18.2e}")
+
+
+if __name__ == "__main__":
+    main()
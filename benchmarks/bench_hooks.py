@@ -0,0 +1,57 @@
+"""
+Measures the overhead of the instrumentation hooks on small calls, where
+it weighs the most
+
+Run from the repository root with ``python -m benchmarks.bench_hooks``.
+Each call is timed without any hook, with a hook collecting the events,
+and with a hook while tracemalloc traces allocations.
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from prepropy.hooks import hooked, stage
+from prepropy.imputation import imputation
+from prepropy.scaler import Scaler
+
+
+def best_us(func, number):
+    """
+    Returns the fastest of 5 runs of func in microseconds per call
+    """
+    times = timeit.repeat(func, number=number, repeat=5)
+    return min(times) / number * 1e6
+
+
+def empty_stage():
+    with stage("bench.empty", 1, 1):
+        pass
+
+
+def main(n_rows=1000, n_cols=10):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+    X.columns = [f"x{i}" for i in range(n_cols)]
+    X = X.mask(rng.random(X.shape) < 0.05)
+    features = list(X.columns)
+    imputer = imputation("mean").fit(X)
+    scaler = Scaler().fit(X, features)
+    print(f"{n_rows} x {n_cols}")
+    print(f"{'call':<20}{'no hook (us)':>14}{'hook':>10}{'traced':>10}")
+    calls = [
+        ("empty stage", empty_stage, 100_000),
+        ("imputation.fill", lambda: imputer.fill(X), 200),
+        ("Scaler.transform", lambda: scaler.transform(X), 200),
+    ]
+    for name, func, number in calls:
+        plain = best_us(func, number)
+        with hooked(callback=lambda event: None):
+            hook = best_us(func, number)
+        with hooked(callback=lambda event: None, trace_memory=True):
+            traced = best_us(func, number)
+        print(f"{name:<20}{plain:>14.2f}{hook:>10.2f}{traced:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
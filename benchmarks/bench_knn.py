@@ -0,0 +1,38 @@
+"""
+Times knn imputation filling rows with many different missing patterns
+
+Run from the repository root with ``python -m benchmarks.bench_knn``.
+Peak memory is measured with tracemalloc, in a second run on a new fit,
+on top of the input frame.
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from prepropy.imputation import imputation
+
+
+def main(sizes=((20_000, 5_000), (200_000, 20_000)), missing=0.15):
+    print(f"{'fit rows':>9}{'fill rows':>11}{'seconds':>9}{'peak (MB)':>11}")
+    for n_fit, n_fill in sizes:
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.normal(size=(n_fit, 10)))
+        X = X.mask(rng.random(X.shape) < missing)
+        imputer = imputation("knn").fit(X)
+        start = time.perf_counter()
+        imputer.fill(X.iloc[:n_fill])
+        seconds = time.perf_counter() - start
+        # timed without tracing, which slows the small allocations down,
+        # and traced on a new fit so that no search index is reused
+        imputer = imputation("knn").fit(X)
+        tracemalloc.start()
+        imputer.fill(X.iloc[:n_fill])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{n_fit:>9}{n_fill:>11}{seconds:>9.2f}{peak / 2 ** 20:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
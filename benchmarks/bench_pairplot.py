@@ -0,0 +1,40 @@
+"""
+Measures the size of the eda() pairplot spec against the number of rows
+
+Run from the repository root with ``python -m benchmarks.bench_pairplot``.
+"""
+import time
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from prepropy.eda import eda
+
+MODES = {
+    "all rows": {"max_rows": None},
+    "max_rows=5000": {},
+    "binned": {"pairplot": "binned"},
+}
+
+
+def main(n_features=6, sizes=(10_000, 100_000, 1_000_000)):
+    alt.data_transformers.disable_max_rows()
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10}{'mode':>16}{'spec (MB)':>12}{'seconds':>10}")
+    for n_rows in sizes:
+        df = pd.DataFrame(rng.normal(size=(n_rows, n_features)))
+        df.columns = [f"x{i}" for i in range(n_features)]
+        df["target"] = rng.integers(0, 3, size=n_rows)
+        for name, options in MODES.items():
+            start = time.perf_counter()
+            spec = eda(df, "target", **options)["pairplot"].to_json()
+            seconds = time.perf_counter() - start
+            print(
+                f"{n_rows:>10}{name:>16}{len(spec) / 2 ** 20:>12.2f}"
+                f"{seconds:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
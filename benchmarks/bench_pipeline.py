@@ -0,0 +1,56 @@
+"""
+Compares the fused Pipeline with imputation.fill followed by
+Scaler.transform
+
+Run from the repository root with ``python -m benchmarks.bench_pipeline``.
+Peak memory is measured with tracemalloc on top of the input frame.
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from prepropy.imputation import imputation
+from prepropy.pipeline import Pipeline
+from prepropy.scaler import Scaler
+
+
+def measure(func):
+    """
+    Returns the seconds and the peak traced MB of func()
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20
+
+
+def main(n_rows=1_000_000, n_cols=20, n_scaled=10, missing=0.05):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+    X.columns = [f"x{i}" for i in range(n_cols)]
+    X = X.mask(rng.random(X.shape) < missing)
+    features = list(X.columns[:n_scaled])
+    imputer = imputation("mean").fit(X)
+    scaler = Scaler().fit(imputer.fill(X), features)
+    pipe = Pipeline(imputer, scaler)
+    input_mb = X.memory_usage().sum() / 2 ** 20
+    print(f"{n_rows} x {n_cols}, {n_scaled} scaled, input {input_mb:.0f} MB")
+    print(f"{'method':<22}{'seconds':>9}{'peak (MB)':>11}")
+    methods = [
+        ("fill + transform", lambda: scaler.transform(imputer.fill(X))),
+        ("pipeline", lambda: pipe.transform(X)),
+        ("pipeline copy=False", lambda: pipe.transform(X, copy=False)),
+    ]
+    for name, func in methods:
+        func()
+        seconds, peak = measure(func)
+        print(f"{name:<22}{seconds:>9.2f}{peak:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
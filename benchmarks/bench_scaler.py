@@ -0,0 +1,75 @@
+"""
+Compares the numpy scaling engine with the scikit-learn backed path
+
+Run from the repository root with ``python -m benchmarks.bench_scaler``.
+"""
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from prepropy.scaler import Scaler
+
+SCALER_TYPES = ["StandardScaler", "MinMaxScaler", "MaxAbsScaler"]
+
+
+def import_time(module):
+    """
+    Returns the seconds a fresh interpreter takes to import a module, on top
+    of numpy and pandas
+    """
+    code = (
+        "import time, numpy, pandas; t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    return float(out.stdout)
+
+
+def sklearn_fit_transform(scaler_type, X, features):
+    """
+    Fits and applies a scikit-learn scaler the way scaler() used to
+    """
+    from sklearn import preprocessing
+
+    est = getattr(preprocessing, scaler_type)().fit(X[features])
+    X_scaled = X.copy()
+    X_scaled[features] = est.transform(X[features])
+    return X_scaled
+
+
+def main(n_rows=1_000_000, n_cols=20, repeat=3):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.lognormal(size=(n_rows, n_cols)))
+    X.columns = [f"x{i}" for i in range(n_cols)]
+    features = list(X.columns)
+    for module in ["sklearn.preprocessing", "prepropy.scaler"]:
+        print(f"import {module:<24}{import_time(module):>8.3f} s")
+    print(
+        f"{'scaler':<16}{'sklearn (s)':>12}{'numpy (s)':>12}"
+        f"{'float32 (s)':>13}"
+    )
+    for scaler_type in SCALER_TYPES:
+        runs = {
+            "sklearn": lambda: sklearn_fit_transform(scaler_type, X, features),
+            "numpy": lambda: Scaler(scaler_type).fit(X, features).transform(X),
+            "float32": lambda: Scaler(scaler_type, dtype=np.float32)
+            .fit(X, features)
+            .transform(X),
+        }
+        times = {
+            name: min(timeit.repeat(run, number=1, repeat=repeat))
+            for name, run in runs.items()
+        }
+        print(
+            f"{scaler_type:<16}{times['sklearn']:>12.3f}"
+            f"{times['numpy']:>12.3f}{times['float32']:>13.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
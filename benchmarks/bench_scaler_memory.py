@@ -0,0 +1,63 @@
+"""
+Measures the peak memory of scaler() with and without copying the columns
+that are not scaled
+
+Every mode runs in a fresh interpreter, and the reported figure is the peak
+resident set size reached while scaling minus the resident set size once
+the three input frames are built. Run from the repository root with
+``python -m benchmarks.bench_scaler_memory``.
+"""
+import subprocess
+import sys
+
+MODES = {
+    "copy": {},
+    "copy=False": {"copy": False},
+    "inplace": {"inplace": True},
+}
+
+
+def peak_mb(n_rows, n_cols, n_scaled, options):
+    """
+    Returns the extra peak RSS in MB of one scaler() call in a subprocess
+    """
+    code = f"""
+import resource
+import numpy as np
+import pandas as pd
+from prepropy.scaler import scaler
+
+rng = np.random.default_rng(0)
+frames = []
+for _ in range(3):
+    X = pd.DataFrame(rng.lognormal(size=({n_rows}, {n_cols})))
+    X.columns = [f"x{{i}}" for i in range({n_cols})]
+    frames.append(X)
+features = list(frames[0].columns[:{n_scaled}])
+# warm up the code paths on a small frame before measuring
+small = [X.head(10).copy() for X in frames]
+scaler(*small, features, **{options!r})
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+out = scaler(*frames, features, **{options!r})
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print((after - before) / 1024)
+"""
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout)
+
+
+def main(n_rows=1_000_000, n_cols=50, n_scaled=5):
+    scaled_mb = 3 * n_rows * n_scaled * 8 / 2 ** 20
+    input_mb = 3 * n_rows * n_cols * 8 / 2 ** 20
+    print(f"inputs {input_mb:.0f} MB, scaled columns {scaled_mb:.0f} MB")
+    for name, options in MODES.items():
+        extra = peak_mb(n_rows, n_cols, n_scaled, options)
+        print(f"{name:<12}{extra:>8.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares streaming the scaler over a CSV file with just reading it
+
+Run from the repository root with ``python -m benchmarks.bench_scaler_stream``.
+Each pass runs in a fresh interpreter so its peak RSS can be reported.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+PASSES = {
+    "read": "for chunk in chunks(): pass",
+    "read + transform": "for chunk in sc.transform_stream(chunks()): pass",
+    "read + transform + write": (
+        "sc.transform_to_file(chunks(), out, index=False)"
+    ),
+}
+
+
+def run_pass(source, out, chunksize, statement):
+    """
+    Returns the seconds and the peak RSS in MB of one pass over source
+    """
+    code = f"""
+import resource, time
+import pandas as pd
+from prepropy.scaler import Scaler
+
+def chunks():
+    return pd.read_csv({source!r}, chunksize={chunksize})
+
+sc = Scaler().fit(pd.read_csv({source!r}, nrows=10_000), ["x0", "x1", "x2"])
+out = {out!r}
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    seconds, peak = out.stdout.split()
+    return float(seconds), float(peak)
+
+
+def main(n_rows=2_000_000, n_cols=10, chunksize=100_000):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.csv")
+        X = pd.DataFrame(rng.normal(size=(n_rows, n_cols)))
+        X.columns = [f"x{i}" for i in range(n_cols)]
+        X.to_csv(source, index=False)
+        size_mb = os.path.getsize(source) / 2 ** 20
+        del X
+        print(f"{n_rows} rows, {size_mb:.0f} MB of CSV, chunks of {chunksize}")
+        print(f"{'pass':<28}{'seconds':>9}{'peak RSS (MB)':>15}")
+        out = os.path.join(tmp, "scaled.csv")
+        for name, statement in PASSES.items():
+            seconds, peak = run_pass(source, out, chunksize, statement)
+            print(f"{name:<28}{seconds:>9.2f}{peak:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Runs the benchmarks of eda, imputation and scaler across data shapes and
+flags regressions against a saved baseline
+
+Run from the repository root, for example::
+
+    python -m benchmarks.suite --size small --save baseline.json
+    python -m benchmarks.suite --size small --compare baseline.json
+
+Every case runs on synthetic data generated with a fixed seed, so the
+suite needs no network access. Each case is timed over --repeat runs, the
+fastest being kept, then run once more under tracemalloc for its peak
+memory, which includes the hash tables of pandas. With --compare, a case
+whose time or peak memory grew by more than --threshold over the baseline
+is flagged and the exit status is 1. Baselines are only comparable on the
+machine they were saved on.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from prepropy.eda import eda
+from prepropy.imputation import imputation
+from prepropy.scaler import scaler
+
+SIZES = {"small": 20_000, "medium": 200_000, "large": 2_000_000}
+
+# differences below these are noise whatever the threshold
+MIN_SECONDS = 0.005
+MIN_MB = 1.0
+
+
+def tall(n_rows, rng):
+    """
+    Many rows of a few numeric features
+    """
+    df = pd.DataFrame(rng.normal(size=(n_rows, 10)))
+    df.columns = [f"x{i}" for i in range(10)]
+    df["target"] = rng.integers(0, 3, size=n_rows)
+    return df
+
+
+def wide(n_rows, rng):
+    """
+    Fewer rows of many numeric features
+    """
+    n_rows = max(n_rows // 20, 100)
+    df = pd.DataFrame(rng.normal(size=(n_rows, 500)))
+    df.columns = [f"x{i}" for i in range(500)]
+    df["target"] = rng.integers(0, 3, size=n_rows)
+    return df
+
+
+def sparse_nan(n_rows, rng):
+    """
+    Numeric features with 30% missing values, and a categorical one
+    """
+    df = pd.DataFrame(rng.normal(size=(n_rows, 20)))
+    df.columns = [f"x{i}" for i in range(20)]
+    df = df.mask(rng.random(df.shape) < 0.3)
+    df["cat"] = rng.choice(["a", "b", "c", None], size=n_rows)
+    df["target"] = rng.integers(0, 3, size=n_rows)
+    return df
+
+
+def high_cardinality(n_rows, rng):
+    """
+    ID-like columns and a target with many classes
+    """
+    df = pd.DataFrame({"x": rng.normal(size=n_rows)})
+    df["id"] = rng.permutation(n_rows)
+    df["user"] = pd.Series(rng.integers(0, n_rows // 2, size=n_rows)).map(
+        "u{}".format
+    )
+    df["target"] = rng.integers(0, max(n_rows // 10, 2), size=n_rows)
+    return df
+
+
+SHAPES = {
+    "tall": tall,
+    "wide": wide,
+    "sparse_nan": sparse_nan,
+    "high_cardinality": high_cardinality,
+}
+
+
+def numeric_features(df):
+    """
+    The numeric columns but the target
+    """
+    columns = df.drop(columns="target").select_dtypes("number").columns
+    return list(columns)
+
+
+def case_eda(df):
+    return lambda: dict(eda(df, "target"))
+
+
+def case_eda_approximate(df):
+    return lambda: dict(eda(df, "target", approximate=True))
+
+
+def case_imputation_fit(df):
+    return lambda: imputation("auto").fit(df)
+
+
+def case_imputation_fill(df):
+    imputer = imputation("auto").fit(df)
+    return lambda: imputer.fill(df)
+
+
+def case_scaler(df):
+    features = numeric_features(df)
+    n = len(df) // 3
+    parts = [df.iloc[:n], df.iloc[n: 2 * n], df.iloc[2 * n:]]
+    return lambda: scaler(*parts, features)
+
+
+# each case builds the function to measure from the data, outside timing
+CASES = {
+    "eda": case_eda,
+    "eda_approximate": case_eda_approximate,
+    "imputation_fit": case_imputation_fit,
+    "imputation_fill": case_imputation_fill,
+    "scaler": case_scaler,
+}
+
+
+def measure(func, repeat):
+    """
+    Returns the fastest of repeat runs of func in seconds and its peak
+    traced memory in MB
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak / 2 ** 20
+
+
+def run(size, cases, shapes, repeat):
+    """
+    Runs the cases on the shapes and returns the results by case id
+    """
+    results = {}
+    for shape in shapes:
+        df = SHAPES[shape](SIZES[size], np.random.default_rng(0))
+        n_rows = len(df)
+        input_mb = df.memory_usage(deep=True).sum() / 2 ** 20
+        for case in cases:
+            seconds, peak = measure(CASES[case](df), repeat)
+            key = f"{case}/{shape}/{size}"
+            results[key] = {
+                "rows": n_rows,
+                "columns": df.shape[1],
+                "seconds": seconds,
+                "rows_per_second": n_rows / seconds,
+                "mb_per_second": input_mb / seconds,
+                "peak_mb": peak,
+            }
+            print(
+                f"{key:<42}{seconds:>9.3f}{n_rows / seconds:>14,.0f}"
+                f"{input_mb / seconds:>10.1f}{peak:>11.1f}",
+                flush=True,
+            )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns the regressions of results against a baseline, as messages
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]
+        for stat, slack, unit in [
+            ("seconds", MIN_SECONDS, "s"),
+            ("peak_mb", MIN_MB, " MB"),
+        ]:
+            new, old = result[stat], base[stat]
+            if new > old * (1 + threshold) and new - old > slack:
+                regressions.append(
+                    f"{key} {stat}: {old:.3f}{unit} -> {new:.3f}{unit} "
+                    f"(+{(new / old - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def environment():
+    """
+    Describes the machine and library versions the results come from
+    """
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", choices=list(SIZES), default="small")
+    parser.add_argument(
+        "--cases", default=",".join(CASES), help="comma separated cases"
+    )
+    parser.add_argument(
+        "--shapes", default=",".join(SHAPES), help="comma separated shapes"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a JSON baseline to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="the relative growth flagged as a regression. Default 0.2",
+    )
+    args = parser.parse_args(argv)
+    cases = args.cases.split(",")
+    shapes = args.shapes.split(",")
+    unknown = set(cases) - set(CASES) | set(shapes) - set(SHAPES)
+    if unknown:
+        parser.error(f"unknown cases or shapes: {sorted(unknown)}")
+    print(
+        f"{'case/shape/size':<42}{'seconds':>9}{'rows/s':>14}"
+        f"{'MB/s':>10}{'peak MB':>11}"
+    )
+    results = run(args.size, cases, shapes, args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {"environment": environment(), "results": results},
+                f,
+                indent=2,
+            )
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["environment"] != environment():
+            print("warning: the baseline comes from another environment")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for message in regressions:
+            print("REGRESSION " + message)
+        if regressions:
+            return 1
+        print(f"no regression beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class ResultCache:
+    """
+    A least recently used cache of results, optionally persisted to disk
+
+    Results are kept in memory under string keys, usually built with
+    fingerprint, and the least recently used one is dropped once more than
+    maxsize are kept. With a path, every result is also pickled to a file
+    named after its key in that directory, so other processes and later
+    sessions find it; entries dropped from memory are read back from disk.
+    The files are loaded with pickle, so only use a directory you trust.
+
+    Parameters
+    --------
+    maxsize: int
+        the most results kept in memory. Default 32
+    path: str
+        a directory to persist the results to, created if needed.
+        Default None, memory only
+
+    Attributes
+    --------
+    hits: int
+        the number of lookups that found a result
+    misses: int
+        the number of lookups that did not
+
+    Examples
+    --------
+    >>>cache = ResultCache(maxsize=8, path="~/.cache/prepropy")
+    >>>res = eda(df, "quality", cache=cache)
+    """
+
+    def __init__(self, maxsize=32, path=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.path = None if path is None else os.path.expanduser(path)
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key):
+        """
+        Returns the result cached under key, None if there is none
+
+        Parameters
+        --------
+        key: str
+            the key the result was put under
+        """
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return self._results[key]
+        if self.path is not None:
+            try:
+                with open(self._file(key), "rb") as f:
+                    result = pickle.load(f)
+            except FileNotFoundError:
+                pass
+            else:
+                self._keep(key, result)
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """
+        Caches a result under key
+
+        Parameters
+        --------
+        key: str
+            a key made of letters, digits, "-" and "_", e.g. a fingerprint
+        result: object
+            the result to cache, picklable with a path
+        """
+        self._keep(key, result)
+        if self.path is not None:
+            # written to a temporary file first so readers never see a
+            # partial result
+            tmp = f"{self._file(key)}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._file(key))
+
+    def clear(self):
+        """
+        Drops every cached result, from disk too
+        """
+        self._results.clear()
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.path, name))
+
+    def _keep(self, key, result):
+        """
+        Keeps a result in memory, dropping the least recently used ones
+        """
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def _file(self, key):
+        """
+        The file a result is persisted to
+        """
+        return os.path.join(self.path, key + ".pkl")
+
+
+def fingerprint(df, *args):
+    """
+    Returns a content hash of a dataframe and other arguments
+
+    Every value is hashed, so any change to the data gives another
+    fingerprint: the column labels, dtypes and index, then each column
+    through its raw buffer for numpy dtypes, or through the 64 bit hashes
+    of pandas for object and extension dtypes. The buffers are read in
+    place with SHA-1, at about 1 GB/s.
+
+    Parameters
+    --------
+    df: pandas.DataFrame
+        the dataframe to hash
+    *args:
+        other values the result depends on, hashed through their repr
+
+    Returns
+    --------
+    str
+        a hex digest
+
+    Examples
+    --------
+    >>>fingerprint(df, "quality")
+    """
+    digest = hashlib.sha1()
+    digest.update(
+        repr(
+            (list(df.columns), [str(d) for d in df.dtypes], df.shape, args)
+        ).encode()
+    )
+    if isinstance(df.index, pd.RangeIndex):
+        index = df.index
+        digest.update(repr((index.start, index.stop, index.step)).encode())
+    else:
+        _hash_values(digest, df.index)
+    for _, column in df.items():
+        _hash_values(digest, column)
+    return digest.hexdigest()
+
+
+def _hash_values(digest, values):
+    """
+    Adds the values of a column or index to a hash
+    """
+    if isinstance(values.dtype, np.dtype) and values.dtype != object:
+        arr = np.ascontiguousarray(values.to_numpy())
+    else:
+        arr = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    digest.update(arr.view(np.uint8))
@@ -1,8 +1,43 @@
+import copy
+import os
+from collections.abc import MutableMapping
+
+import numpy as np
 import pandas as pd
-import altair as alt
 
+from prepropy.cache import fingerprint
+from prepropy.hooks import stage
+from prepropy.profile import Profile, _float_blocks, _float_view
+from prepropy.profile import _is_numeric
+from prepropy.stats import CrossProducts
+
+PAIRPLOTS = ["scatter", "binned"]
+CORRELATIONS = ["pearson", "spearman"]
+
+# the most target classes the pairplot sample is stratified on: keeping
+# max_rows rows of each class would not bound memory beyond that, so the
+# sample is then a uniform one of max_rows rows
+MAX_STRATA = 20
+
+# the keys of eda that only need the dtypes
+FEATURE_KEYS = [
+    "nb_cat_features",
+    "cat_features_name",
+    "nb_num_features",
+    "num_features_name",
+]
 
-def eda(df, target):
+
+def eda(
+    df,
+    target,
+    max_rows=5000,
+    pairplot="scatter",
+    bins=10,
+    cor="pearson",
+    approximate=False,
+    cache=None,
+):
     """
     Generates a dictionary to access summary statistics of the given data frame
 
@@ -12,13 +47,44 @@ def eda(df, target):
         input dataframe to be analyzed
     target : string
         target column name
+    max_rows : int
+        the most rows drawn in the scatter pairplot; larger dataframes are
+        sampled with the class ratios of the target kept, or uniformly when
+        the target has more than MAX_STRATA classes. None draws every row.
+        Default 5000, the row limit of Altair
+    pairplot : string
+        "scatter" draws the (sampled) rows, "binned" draws for each pair of
+        numeric features a 2-D histogram of all the rows, computed with
+        NumPy so the chart only holds bins x bins counts per pair.
+        Default "scatter"
+    bins : int
+        the number of bins per feature of the binned pairplot. Default 10
+    cor : string
+        "pearson" accumulates the cross-products of the numeric features
+        in the same pass as the summary, "spearman" computes them over the
+        ranks of each column (missing values are left out of the ranking,
+        so with missing values pairs are not re-ranked as in pandas).
+        None skips the correlations. Default "pearson"
+    approximate : bool
+        whether to count the target classes and the distinct values of the
+        features with sketches in bounded memory, see Profile. The class
+        counts are then estimates of the most frequent classes, the
+        "summary" gets a "distinct" column and the "top_values" key holds
+        the most frequent values of each feature. Default False
+    cache : ResultCache
+        a cache to look the result up in, keyed on the fingerprint of the
+        dataframe and the arguments, so a call on unchanged data returns a
+        copy of the cached result instead of recomputing it. Default None
 
     Returns
     --------
-    dict
-        access summary statistics of the given data frame.
-    cor
-        the correlation map
+    EDAResult
+        a dictionary to access summary statistics of the given data frame,
+        each computed on first access (a dict with cache). The "summary"
+        key holds a dataframe with the dtype, missing count, count, mean,
+        std, min and max of every feature, all computed in one pass. The
+        "cor" key holds the correlation matrix of the numeric features,
+        computed over the rows where both features are present.
 
     Examples
     --------
@@ -33,26 +99,346 @@ def eda(df, target):
     # Check the dataframe input
     if not isinstance(df, pd.DataFrame):
         raise TypeError("Input data must be an instance of DataFrame")
-    # Create an empty dictionary
+    # checked now, the keys being computed later
+    if target not in df.columns:
+        raise KeyError(f"Target {target} is not a column of the dataframe")
+    if pairplot not in PAIRPLOTS:
+        raise KeyError('Please use pairplot "scatter" or "binned"')
+    if cor is not None and cor not in CORRELATIONS:
+        raise KeyError('Please use cor "pearson", "spearman" or None')
+    if cache is not None:
+        args = (target, max_rows, pairplot, bins, cor, approximate)
+        with stage("eda.fingerprint", *df.shape):
+            key = fingerprint(df, *args)
+        res = cache.get(key)
+        if res is None:
+            # every key is computed, so the cache keeps no reference to df
+            res = dict(eda(df, *args))
+            cache.put(key, res)
+        # a deep copy, so that changing the result in place, e.g. the
+        # summary dataframe, leaves the cache as it was
+        return copy.deepcopy(res)
+    return EDAResult(df, target, max_rows, pairplot, bins, cor, approximate)
+
+
+class EDAResult(MutableMapping):
+    """
+    The dictionary returned by eda, computing each key on first access
+
+    The keys are those of the eager dictionary, in the same order, but
+    nothing is computed until a key is read, and each value is then kept.
+    Keys that share work share it: the feature names only need the dtypes,
+    the missing values, class counts and summary come from one Profile
+    pass over the dataframe, reused by the pairplot, and the correlations
+    reuse that pass too when read first. Reading "nb_num_features" thus
+    never profiles the rows nor builds the pairplot. dict(res) computes
+    every key.
+
+    The dataframe is read when the keys are computed, so it should not be
+    modified in between. Keys can be added, replaced and deleted as in a
+    dict.
+
+    Examples
+    --------
+    >>>res = eda(df, "quality")
+    >>>res["nb_num_features"]
+    """
+
+    def __init__(self, df, target, max_rows, pairplot, bins, cor, approximate):
+        self._df = df
+        self._target = target
+        self._max_rows = max_rows
+        self._pairplot = pairplot
+        self._bins = bins
+        self._cor = cor
+        self._approximate = approximate
+        self._profile = None
+        self._values = {}
+        self._keys = [
+            "nb_missing_values",
+            "nb_cat_features",
+            "cat_features_name",
+            "nb_num_features",
+            "num_features_name",
+            "nb_class",
+            "class_ratio",
+            "summary",
+        ]
+        if approximate:
+            self._keys.append("top_values")
+        self._keys += ["cor", "pairplot"]
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            if key not in self._keys:
+                raise KeyError(key)
+            self._compute(key)
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            self._keys.append(key)
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        self._keys.remove(key)
+        self._values.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        computed = [key for key in self._keys if key in self._values]
+        return f"EDAResult(keys={self._keys}, computed={computed})"
+
+    def _compute(self, key):
+        """
+        Computes key, along with the keys that come from the same work
+        """
+        if key in FEATURE_KEYS:
+            num_fea, cat_fea = [], []
+            for col, dtype in self._df.dtypes.items():
+                if col == self._target:
+                    continue
+                if _is_numeric(dtype):
+                    num_fea.append(col)
+                else:
+                    cat_fea.append(col)
+            values = {
+                "nb_cat_features": len(cat_fea),
+                "cat_features_name": cat_fea,
+                "nb_num_features": len(num_fea),
+                "num_features_name": num_fea,
+            }
+        elif key == "cor":
+            values = {"cor": self._correlation()}
+        elif key == "pairplot":
+            values = {"pairplot": self._pairplot_chart()}
+        else:
+            values = _profile_result(self._get_profile())
+        for name, value in values.items():
+            if name in self._keys:
+                self._values.setdefault(name, value)
+
+    def _get_profile(self, correlation=False):
+        """
+        Returns the profile of the dataframe, profiling it on first use
+        """
+        if self._profile is None:
+            with stage("eda.profile", *self._df.shape):
+                self._profile = Profile(
+                    self._target,
+                    correlation=correlation,
+                    approximate=self._approximate,
+                ).update(self._df)
+        elif correlation and self._profile.cross is None:
+            # only the cross-products are missing from the profile
+            profile, df = self._profile, self._df
+            num_fea = profile.num_features
+            with stage("eda.correlation", len(df), len(num_fea)):
+                columns = [_float_view(df[f]) for f in num_fea]
+                profile.cross = CrossProducts()
+                for arr in _float_blocks(
+                    columns, len(df), profile.chunk_size
+                ):
+                    profile.cross.update(arr)
+        return self._profile
+
+    def _correlation(self):
+        """
+        Returns the correlation matrix of the numeric features
+        """
+        if self._cor == "pearson":
+            return self._get_profile(correlation=True).correlation()
+        if self._cor == "spearman":
+            num_fea = self["num_features_name"]
+            with stage("eda.rank", len(self._df), len(num_fea)):
+                ranks = self._df[num_fea].rank()
+            with stage("eda.correlation", len(self._df), len(num_fea)):
+                profile = Profile(correlation=True).update(ranks)
+                return profile.correlation()
+        return None
+
+    def _pairplot_chart(self):
+        """
+        Returns the pairplot of the numeric features
+        """
+        df, target = self._df, self._target
+        profile = self._get_profile()
+        num_fea = profile.num_features
+        if self._pairplot == "binned":
+            summary = self["summary"].loc[num_fea]
+            with stage("eda.histograms", len(df), len(num_fea)):
+                hist = _PairHistograms(
+                    num_fea, summary["min"], summary["max"], self._bins
+                )
+                counts = hist.update(df).frame()
+            with stage("eda.chart", len(counts), len(num_fea)):
+                return _binned_chart(counts)
+        with stage("eda.sample", len(df), len(num_fea) + 1):
+            sample = _StratifiedSample(
+                num_fea + [target], target, self._max_rows
+            )
+            data = sample.update(df).rows()
+        with stage("eda.chart", len(data), len(num_fea)):
+            return _scatter_chart(data, num_fea, target)
+
+
+def eda_stream(
+    source,
+    target,
+    chunksize=100_000,
+    max_rows=5000,
+    pairplot="scatter",
+    bins=10,
+    cor="pearson",
+    approximate=False,
+    **kwargs,
+):
+    """
+    Generates the same dictionary as eda from data streamed in chunks
+
+    Only one chunk is in memory at a time: the statistics are mergeable
+    accumulators (missing counts, class counts, moments, min and max)
+    updated chunk by chunk, and the scatter pairplot draws a stratified
+    sample of at most max_rows rows kept while streaming. The binned
+    pairplot needs the min and max of every feature before binning, so it
+    reads a file twice and cannot be drawn from an iterator of chunks. The
+    Spearman correlation needs the ranks of whole columns and is only
+    available from eda.
+
+    Parameters
+    --------
+    source : str or iterable of pandas.DataFrame
+        a .parquet or CSV file, or the chunks themselves, e.g. from
+        pd.read_csv(chunksize=)
+    target : string
+        target column name
+    chunksize : int
+        the number of rows read from a file at a time. Default 100_000
+    max_rows : int
+        the most rows drawn in the scatter pairplot. Default 5000
+    pairplot : string
+        "scatter" or "binned", see eda. Default "scatter"
+    bins : int
+        the number of bins per feature of the binned pairplot. Default 10
+    cor : string
+        "pearson" or None, see eda. Default "pearson"
+    approximate : bool
+        whether to count classes and distinct values with sketches, see
+        eda. Default False
+    **kwargs :
+        passed on to pd.read_csv when source is a CSV file
+
+    Returns
+    --------
+    dict
+        the keys returned by eda
+
+    Examples
+    --------
+    >>> res = eda_stream("winequality-red.csv", "quality", sep=";")
+    """
+    if pairplot not in PAIRPLOTS:
+        raise KeyError('Please use pairplot "scatter" or "binned"')
+    is_file = isinstance(source, (str, os.PathLike))
+    if pairplot == "binned" and not is_file:
+        raise ValueError("The binned pairplot needs a file to read twice")
+    if cor == "spearman":
+        raise ValueError("The spearman correlation needs the whole data")
+    if cor is not None and cor not in CORRELATIONS:
+        raise KeyError('Please use cor "pearson", "spearman" or None')
+    chunks = _read_chunks(source, chunksize, **kwargs) if is_file else source
+    profile = Profile(
+        target, correlation=cor == "pearson", approximate=approximate
+    )
+    sample = None
+    for chunk in chunks:
+        if not isinstance(chunk, pd.DataFrame):
+            raise TypeError("Input data must be an instance of DataFrame")
+        with stage("eda.profile", *chunk.shape):
+            profile.update(chunk)
+        if pairplot == "scatter":
+            if sample is None:
+                sample = _StratifiedSample(
+                    profile.num_features + [target], target, max_rows
+                )
+            with stage("eda.sample", len(chunk), len(sample.columns)):
+                sample.update(chunk)
+    if profile.features is None:
+        raise ValueError("DataFrame cannot be empty")
+    res = _profile_result(profile)
+    res["cor"] = profile.correlation() if cor == "pearson" else None
+    num_fea = profile.num_features
+    if pairplot == "binned":
+        summary = res["summary"].loc[num_fea]
+        hist = _PairHistograms(num_fea, summary["min"], summary["max"], bins)
+        for chunk in _read_chunks(source, chunksize, **kwargs):
+            with stage("eda.histograms", len(chunk), len(num_fea)):
+                hist.update(chunk)
+        counts = hist.frame()
+        with stage("eda.chart", len(counts), len(num_fea)):
+            res["pairplot"] = _binned_chart(counts)
+    else:
+        data = sample.rows()
+        with stage("eda.chart", len(data), len(num_fea)):
+            res["pairplot"] = _scatter_chart(data, num_fea, target)
+    return res
+
+
+def _read_chunks(path, chunksize, **kwargs):
+    """
+    Yields a .parquet or CSV file as dataframes of chunksize rows
+    """
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, **kwargs)
+
+
+def _profile_result(profile):
+    """
+    Returns the statistics keys of eda from a profile
+    """
     res = {}
-    # obtain statistical information
-    df_fea = df.drop(target, 1)
-    num_fea = df_fea.select_dtypes("number").columns.to_list()
-    cat_fea = list(set(list(df_fea.columns)) - set(num_fea))
-    key_null = list(df_fea.isnull().sum().index)
-    val_null = list(df_fea.isnull().sum().values)
-    res["nb_missing_values"] = list(zip(key_null, val_null))
+    res["nb_missing_values"] = list(
+        zip(profile.features, profile.missing.tolist())
+    )
+    num_fea = profile.num_features
+    cat_fea = profile.cat_features
     res["nb_cat_features"] = len(cat_fea)
     res["cat_features_name"] = cat_fea
     res["nb_num_features"] = len(num_fea)
     res["num_features_name"] = num_fea
-    res["nb_class"] = len(list(set(df[target])))
-    class_count = df[target].value_counts(normalize=True).values
-    res["class_ratio"] = list(class_count.round(4))
-    # Create a pair plots with Altair
+    res["nb_class"] = profile.n_classes()
+    res["class_ratio"] = profile.class_ratio().round(4).tolist()
+    res["summary"] = profile.summary()
+    if profile.approximate:
+        res["top_values"] = profile.top_values()
+    return res
+
+
+def _scatter_chart(data, num_fea, target):
+    """
+    Returns the scatter pairplot of the numeric features, colored by target
+    """
+    # Altair is imported here as it is slow to load
+    import altair as alt
+
     color_lab = target + ":N"
-    chart = (
-        alt.Chart(df)
+    return (
+        alt.Chart(data)
         .mark_circle()
         .encode(
             alt.X(alt.repeat("column"), type="quantitative"),
@@ -62,5 +448,238 @@ def eda(df, target):
         .properties(width=100, height=100)
         .repeat(row=num_fea, column=num_fea)
     )
-    res["pairplot"] = chart
-    return res
+
+
+def _binned_chart(counts):
+    """
+    Returns the binned pairplot of the pair histograms of _PairHistograms
+    """
+    import altair as alt
+
+    # the aggregates are passed as inline values, their size does not
+    # depend on the number of rows
+    return (
+        alt.Chart(alt.InlineData(values=counts.to_dict("records")))
+        .mark_rect()
+        .encode(
+            alt.X("x_start:Q", bin="binned", title=None),
+            alt.X2("x_end:Q"),
+            alt.Y("y_start:Q", bin="binned", title=None),
+            alt.Y2("y_end:Q"),
+            color="count:Q",
+        )
+        .properties(width=100, height=100)
+        .facet(row="y_feature:N", column="x_feature:N")
+        .resolve_scale(x="independent", y="independent")
+    )
+
+
+class _StratifiedSample:
+    """
+    A sample of at most n rows per target class, kept while streaming
+
+    Every row gets a random key and each class keeps its n rows with the
+    smallest keys, a uniform sample of the class whatever the chunking.
+    rows() then takes from each class its share of n, so the sample keeps
+    the class ratios of the target; missing labels are a class of their
+    own. The class shares come from exact class counts kept along, so they
+    do not depend on how the profile counts classes. Once more than
+    MAX_STRATA classes are seen, only the n rows with the smallest keys
+    overall are kept, a uniform sample of the rows, so memory stays bounded
+    whatever the number of classes. With n None every row is kept.
+    """
+
+    def __init__(self, columns, target, n, seed=0):
+        self.columns = columns
+        self.target = target
+        self.n = n
+        self.n_seen = 0
+        self._rng = np.random.default_rng(seed)
+        self.stratified = True
+        self._counts = None
+        self._rows = None
+        self._keys = np.empty(0)
+        self._positions = np.empty(0, dtype=np.int64)
+
+    def update(self, df):
+        """
+        Adds the rows of a dataframe to the sample
+        """
+        positions = self.n_seen + np.arange(len(df))
+        self.n_seen += len(df)
+        keys = self._rng.random(len(df))
+        if self.n is None:
+            data = df[self.columns]
+        else:
+            # a row not sampled within its chunk is not sampled at all, so
+            # only the rows sampled within the chunk are copied
+            labels = df[self.target]
+            self._count(labels)
+            keep = self._sampled(labels, keys)
+            data = df.iloc[keep][self.columns]
+            keys, positions = keys[keep], positions[keep]
+        if self._rows is not None:
+            data = pd.concat([self._rows, data])
+            keys = np.concatenate([self._keys, keys])
+            positions = np.concatenate([self._positions, positions])
+        if self.n is not None:
+            keep = self._sampled(data[self.target], keys)
+            data = data.iloc[keep]
+            keys, positions = keys[keep], positions[keep]
+        self._rows, self._keys, self._positions = data, keys, positions
+        return self
+
+    def _count(self, labels):
+        """
+        Adds labels to the class counts, and stops stratifying once more
+        than MAX_STRATA classes are seen
+        """
+        if not self.stratified:
+            return
+        counts = labels.value_counts(dropna=False)
+        if self._counts is not None:
+            counts = self._counts.add(counts, fill_value=0)
+        missing = counts.index.isna()
+        if (~missing).sum() + missing.any() > MAX_STRATA:
+            # the n smallest keys overall are among the n smallest of each
+            # class, so the uniform sample is exact from here on
+            self.stratified = False
+            counts = None
+        self._counts = counts
+
+    def _sampled(self, labels, keys):
+        """
+        Returns the positions of the rows kept, in order
+        """
+        if self.stratified:
+            return _smallest_per_class(labels, keys, self.n)
+        if len(keys) <= self.n:
+            return np.arange(len(keys))
+        return np.sort(np.argpartition(keys, self.n - 1)[: self.n])
+
+    def rows(self):
+        """
+        Returns the sampled rows in their original order
+        """
+        data, keys = self._rows, self._keys
+        if self.n is not None and self.n_seen > self.n and self.stratified:
+            labels, counts = data[self.target], self._counts
+            _, uniques = pd.factorize(labels)
+            sizes = [counts.get(label, 0) for label in uniques]
+            sizes.append(counts[counts.index.isna()].sum())
+            keep = _smallest_per_class(labels, keys, _quota(sizes, self.n))
+            data = data.iloc[keep]
+            positions = self._positions[keep]
+        else:
+            positions = self._positions
+        return data.iloc[np.argsort(positions, kind="stable")]
+
+
+def _smallest_per_class(labels, keys, n):
+    """
+    Returns the positions of the rows with the n smallest keys of each
+    class, n being an int or one count per class code (missing last)
+    """
+    codes, uniques = pd.factorize(labels)
+    codes = np.where(codes < 0, len(uniques), codes)
+    order = np.lexsort((keys, codes))
+    sorted_codes = codes[order]
+    starts = np.searchsorted(sorted_codes, sorted_codes, side="left")
+    rank = np.arange(len(order)) - starts
+    limit = np.broadcast_to(np.asarray(n), (len(uniques) + 1,))
+    return np.sort(order[rank < limit[sorted_codes]])
+
+
+def _quota(sizes, n):
+    """
+    Splits n rows between classes of the given sizes in proportion, by
+    largest remainder
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    quota = sizes * n / sizes.sum()
+    alloc = np.floor(quota).astype(np.int64)
+    extra = np.argsort(alloc - quota, kind="stable")[: n - alloc.sum()]
+    alloc[extra] += 1
+    return alloc
+
+
+class _PairHistograms:
+    """
+    The 2-D histograms of every pair of numeric features, added up chunk by
+    chunk
+
+    Each feature is binned once per chunk into equal width bins between its
+    min and max; the counts of a pair are then a bincount of the combined
+    bin indices, and the pair (j, i) is the transpose of (i, j).
+    """
+
+    def __init__(self, features, lows, highs, bins):
+        self.features = features
+        self.bins = bins
+        self.edges = []
+        for low, high in zip(lows, highs):
+            if not np.isfinite(low):
+                low, high = 0.0, 1.0
+            elif not high > low:
+                high = low + 1.0
+            self.edges.append(np.linspace(low, high, bins + 1))
+        self.counts = {}
+
+    def update(self, df):
+        """
+        Adds the rows of a dataframe to the histograms
+        """
+        bins = self.bins
+        codes = []
+        for feature, edges in zip(self.features, self.edges):
+            values = df[feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            low, high = edges[0], edges[-1]
+            with np.errstate(invalid="ignore"):
+                code = np.floor((values - low) * (bins / (high - low)))
+            code = np.clip(code, 0, bins - 1)
+            # missing values go to an extra bin that is dropped
+            codes.append(np.where(np.isnan(code), bins, code).astype(np.intp))
+        size = bins + 1
+        for i in range(len(self.features)):
+            for j in range(i, len(self.features)):
+                counts = np.bincount(
+                    codes[i] * size + codes[j], minlength=size * size
+                ).reshape(size, size)[:bins, :bins]
+                if (i, j) in self.counts:
+                    counts = counts + self.counts[(i, j)]
+                self.counts[(i, j)] = counts
+        return self
+
+    def frame(self):
+        """
+        Returns one row per non empty bin: x_feature, y_feature, x_start,
+        x_end, y_start, y_end and count
+        """
+        frames = []
+        for (i, j), counts in self.counts.items():
+            pairs = [(i, j, counts)]
+            if i != j:
+                pairs.append((j, i, counts.T))
+            for x, y, grid in pairs:
+                x_bin, y_bin = np.nonzero(grid)
+                frames.append(
+                    pd.DataFrame(
+                        {
+                            "x_feature": self.features[x],
+                            "y_feature": self.features[y],
+                            "x_start": self.edges[x][x_bin],
+                            "x_end": self.edges[x][x_bin + 1],
+                            "y_start": self.edges[y][y_bin],
+                            "y_end": self.edges[y][y_bin + 1],
+                            "count": grid[x_bin, y_bin],
+                        }
+                    )
+                )
+        if not frames:
+            return pd.DataFrame(
+                columns=[
+                    "x_feature", "y_feature", "x_start", "x_end", "y_start",
+                    "y_end", "count",
+                ]
+            )
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,151 @@
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+
+Event = namedtuple(
+    "Event", ["stage", "rows", "columns", "elapsed_ns", "bytes_allocated"]
+)
+Event.__doc__ = """
+A stage of eda, imputation or scaler that has run
+
+Attributes
+--------
+stage: str
+    the stage, e.g. "eda.profile" or "scaler.apply"
+rows: int
+    the number of rows the stage worked on
+columns: int
+    the number of columns the stage worked on
+elapsed_ns: int
+    the wall time of the stage in nanoseconds
+bytes_allocated: int
+    the traced memory the stage left allocated, which can be negative
+    when it frees more than it allocates; None when tracemalloc is not
+    tracing
+"""
+
+_hooks = []
+
+# returned by stage while no hook is registered, so that instrumented code
+# only pays for a function call and an empty with block
+_NO_STAGE = nullcontext()
+
+
+def add_hook(callback):
+    """
+    Registers a callback called with an Event after every stage
+
+    The hot paths of eda, imputation and scaler are split into stages
+    (validation, profiling, fitting, copying, chart building...) and each
+    stage is reported to every registered callback once it is done.
+    Callbacks run in the thread of the stage, after it, and their time is
+    not counted in it. Stages only report their allocations while
+    tracemalloc is tracing, see hooked.
+
+    Parameters
+    --------
+    callback: callable
+        called with one Event per stage
+
+    Returns
+    --------
+    The callback, so add_hook can decorate it
+
+    Examples
+    --------
+    >>>@add_hook
+    ...def log(event):
+    ...    print(event.stage, event.elapsed_ns / 1e6, "ms")
+    """
+    _hooks.append(callback)
+    return callback
+
+
+def remove_hook(callback):
+    """
+    Unregisters a callback registered with add_hook
+
+    Parameters
+    --------
+    callback: callable
+        the callback to remove
+    """
+    _hooks.remove(callback)
+
+
+@contextmanager
+def hooked(callback=None, trace_memory=False):
+    """
+    Registers a callback for the duration of a with block
+
+    Parameters
+    --------
+    callback: callable
+        called with one Event per stage. Default None, the events are
+        collected in the list the with statement returns
+    trace_memory: bool
+        whether to trace allocations with tracemalloc during the block, if
+        it is not tracing already, so the events report bytes_allocated.
+        Tracing slows allocations down. Default False
+
+    Yields
+    --------
+    list
+        the events received, when no callback is given
+
+    Examples
+    --------
+    >>>with hooked(trace_memory=True) as events:
+    ...    eda(df, "quality")["pairplot"]
+    >>>pd.DataFrame(events).groupby("stage")["elapsed_ns"].sum()
+    """
+    events = []
+    callback = events.append if callback is None else callback
+    start_tracing = trace_memory and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    add_hook(callback)
+    try:
+        yield events
+    finally:
+        remove_hook(callback)
+        if start_tracing:
+            tracemalloc.stop()
+
+
+def stage(name, rows, columns):
+    """
+    Returns a context manager reporting the with block as a stage to the
+    registered callbacks, or one doing nothing when there are none
+
+    Parameters
+    --------
+    name: str
+        the stage name, prefixed with the module
+    rows: int
+        the number of rows the stage works on
+    columns: int
+        the number of columns the stage works on
+    """
+    if not _hooks:
+        return _NO_STAGE
+    return _stage(name, rows, columns)
+
+
+@contextmanager
+def _stage(name, rows, columns):
+    """
+    Times a with block and sends its Event to the callbacks
+    """
+    tracing = tracemalloc.is_tracing()
+    before = tracemalloc.get_traced_memory()[0] if tracing else None
+    start = time.perf_counter_ns()
+    yield
+    elapsed = time.perf_counter_ns() - start
+    allocated = None
+    if tracing and tracemalloc.is_tracing():
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    event = Event(name, rows, columns, elapsed, allocated)
+    for callback in list(_hooks):
+        callback(event)
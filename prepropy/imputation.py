@@ -1,6 +1,27 @@
+import os
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 
+from prepropy.hooks import stage
+from prepropy.sketch import QuantileSketch
+from prepropy.storage import FORMAT_VERSION, pack, unpack
+from prepropy.storage import read_arrays, write_arrays
+
+STRATEGIES = ["mean", "median", "most_frequent"]
+
+# knn missing patterns with fewer rows than this are searched by brute force
+# over the complete rows, the others through a KD-tree over their columns
+KNN_TREE_ROWS = 16
+# the most complete rows searched by brute force; above it every pattern
+# goes through a KD-tree, built once and then reused by later records
+KNN_BRUTE_ROWS = 50_000
+# the most KD-trees kept between fills, the least recently used is dropped
+KNN_TREES = 8
+# the most distances computed at once by the brute force search
+KNN_BLOCK = 2 ** 22
+
 
 class imputation:
     """
@@ -8,10 +29,18 @@ class imputation:
 
     Parameters
     --------
-    method: str
-        method we wish to do the imputing.
+    method: str or dict
+        method we wish to do the imputing, or a dict of methods by column.
+    n_jobs: int
+        number of processes used by fit, -1 for all cores. Default None
+    n_neighbors: int
+        number of neighbours averaged by the knn method. Default 5
     values: numpy array
         an array with values to be imputed. Default None
+    columns: list
+        the column names the values were fitted on. Default None
+    strategies: list
+        the method used for each of the columns. Default None
 
     Returns
     --------
@@ -23,24 +52,58 @@ class imputation:
     >>>imputer = imputation('mean')
     """
 
-    def __init__(self, method):
+    def __init__(self, method, n_jobs=None, n_neighbors=5):
         """
         Initialize the class
 
         Parameters
         --------
-        method: str
-            method we wish to do the imputing.
+        method: str or dict
+            method we wish to do the imputing: one of mean, median,
+            most_frequent, knn or auto, or a dict mapping column names to
+            one of mean, median, most_frequent. With auto, and for columns
+            missing from a dict, numeric columns use mean and the other
+            columns most_frequent. Fitting raises a KeyError when a key of
+            the dict is not a column.
+        n_jobs: int
+            number of processes used by fit, -1 for all cores. Columns are
+            split into contiguous blocks, numeric blocks are handed to the
+            workers through shared memory and the values are merged back in
+            column order. Default None, fit in the current process
+        n_neighbors: int
+            number of neighbours averaged by the knn method. Default 5
         """
-        if method not in ["mean", "median", "most_frequent"]:
-            raise KeyError("Method must be one of mean, median, most_frequent")
+        if isinstance(method, dict):
+            if not set(method.values()) <= set(STRATEGIES):
+                raise KeyError(
+                    "Column methods must be one of mean, median, most_frequent"
+                )
+        elif method not in STRATEGIES + ["knn", "auto"]:
+            raise KeyError(
+                "Method must be one of mean, median, most_frequent, knn, auto"
+            )
+        if n_neighbors < 1:
+            raise ValueError("n_neighbors must be at least 1")
         self.method = method
+        self.n_jobs = n_jobs
+        self.n_neighbors = n_neighbors
         self.values = None
+        self.columns = None
+        self.strategies = None
+        self._index = None
+        self._stream = None
+        self._complete = None
+        self._trees = OrderedDict()
 
     def fit(self, data):
         """
         Calculates the value to be imputated for each column
 
+        Columns sharing a strategy are fitted together with one call over
+        their block. For knn the values are the column means, used for rows
+        without any observed value, and the complete rows are kept to search
+        the neighbours among.
+
         Parameters
         --------
         data: pandas.core.frame.DataFrame
@@ -55,23 +118,154 @@ class imputation:
         >>>test_df = pd.DataFrame([[np.nan,2,3],[2,np.nan,4],[5,6,7]])
         >>>imputer = imputation('mean')
         >>>imputer.fit(test_df)
+        >>>imputer = imputation({'age': 'median'})
+        >>>imputer.fit(pd.DataFrame({'age': [20, None], 'city': ['a', None]}))
         """
         if type(data) != pd.DataFrame:
             raise TypeError("Input data must be a Pandas Dataframe")
         if data.empty:
             raise ValueError("DataFrame cannot be empty")
-        if self.method == "mean":
-            if data.shape[1] != data.select_dtypes(include=np.number).shape[1]:
+        n_rows, n_cols = data.shape
+        if self.method == "knn":
+            if not _numeric_columns(data).all():
                 raise TypeError("All values in dataframe must be numeric")
-            self.values = data.mean().values
-        elif self.method == "median":
-            if data.shape[1] != data.select_dtypes(include=np.number).shape[1]:
+            with stage("imputation.fit", n_rows, n_cols):
+                complete = data.to_numpy(dtype=np.float64, na_value=np.nan)
+                complete = complete[~np.isnan(complete).any(axis=1)]
+                if not len(complete):
+                    raise ValueError("knn needs at least one complete row")
+                self.strategies = ["knn"] * n_cols
+                self._set_values(data.mean().values, data.columns)
+                self._set_complete(complete)
+            return self
+        with stage("imputation.validate", n_rows, n_cols):
+            self.strategies = _resolve_strategies(self.method, data)
+        n_jobs = _effective_n_jobs(self.n_jobs, n_cols)
+        groups = _group_strategies(self.strategies)
+        values = np.empty(n_cols, dtype=object)
+        for strategy, pos in groups.items():
+            block = data if len(groups) == 1 else data.iloc[:, pos]
+            with stage("imputation.fit", n_rows, len(pos)):
+                if n_jobs > 1:
+                    values[pos] = _fit_parallel(strategy, block, n_jobs)
+                else:
+                    values[pos] = _fit_values(strategy, block)
+        self._set_values(_as_values(values), data.columns)
+        self._stream = None
+        return self
+
+    def partial_fit(self, chunk):
+        """
+        Updates the values to be imputated with one chunk of a larger dataset
+
+        Only running statistics are kept between calls, so memory does not
+        grow with the number of chunks: sums and counts for mean, a
+        QuantileSketch per column for median (exact until a column has more
+        than 200 values, then within about 1% of n in rank) and exact value
+        counts for most_frequent.
+
+        Parameters
+        --------
+        chunk: pandas.core.frame.DataFrame
+            a pandas dataframe holding the next rows of the data
+
+        Returns
+        --------
+        An instance of the imputation class
+
+        Examples
+        --------
+        >>>imputer = imputation('median')
+        >>>for chunk in pd.read_csv('train.csv', chunksize=100_000):
+        >>>    imputer.partial_fit(chunk)
+        """
+        if not isinstance(chunk, pd.DataFrame):
+            raise TypeError("Input data must be a Pandas Dataframe")
+        if self.method == "knn":
+            raise ValueError("knn imputation cannot be fitted in chunks")
+        n_cols = chunk.shape[1]
+        if self._stream is not None and self._stream["n_cols"] != n_cols:
+            raise TypeError("Columns are not Equal")
+        if self._stream is None:
+            self.strategies = _resolve_strategies(self.method, chunk)
+            groups = _group_strategies(self.strategies)
+            self._stream = {"n_cols": n_cols, "n_rows": 0, "groups": groups}
+            if "mean" in groups:
+                self._stream["sum"] = np.zeros(len(groups["mean"]))
+                self._stream["count"] = np.zeros(len(groups["mean"]))
+            if "median" in groups:
+                self._stream["sketch"] = [
+                    QuantileSketch() for _ in groups["median"]
+                ]
+            if "most_frequent" in groups:
+                self._stream["counts"] = [
+                    pd.Series(dtype=np.float64)
+                    for _ in groups["most_frequent"]
+                ]
+        groups = self._stream["groups"]
+        numeric = _numeric_columns(chunk)
+        for strategy in ["mean", "median"]:
+            if strategy in groups and not numeric[groups[strategy]].all():
                 raise TypeError("All values in dataframe must be numeric")
-            self.values = data.median().values
-        elif self.method == "most_frequent":
-            self.values = data.mode().values[0]
+        self._stream["n_rows"] += chunk.shape[0]
+        with stage("imputation.fit", chunk.shape[0], n_cols):
+            values = np.empty(n_cols, dtype=object)
+            if "mean" in groups:
+                pos = groups["mean"]
+                arr = chunk.iloc[:, pos].to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+                self._stream["sum"] += np.nansum(arr, axis=0)
+                self._stream["count"] += np.count_nonzero(
+                    ~np.isnan(arr), axis=0
+                )
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    values[pos] = self._stream["sum"] / self._stream["count"]
+            if "median" in groups:
+                pos = groups["median"]
+                arr = chunk.iloc[:, pos].to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+                for i, sketch in enumerate(self._stream["sketch"]):
+                    sketch.update(arr[:, i])
+                values[pos] = [s.quantile(0.5) for s in self._stream["sketch"]]
+            if "most_frequent" in groups:
+                pos = groups["most_frequent"]
+                counts = self._stream["counts"]
+                for i in range(len(counts)):
+                    counts[i] = counts[i].add(
+                        chunk.iloc[:, pos[i]].value_counts(), fill_value=0
+                    )
+                values[pos] = [_most_frequent(c) for c in counts]
+            self._set_values(_as_values(values), chunk.columns)
+        return self
 
-    def fill(self, data_for_fill):
+    def fit_stream(self, chunks):
+        """
+        Calculates the value to be imputated from an iterable of chunks
+
+        Parameters
+        --------
+        chunks: iterable of pandas.core.frame.DataFrame
+            the chunks making up the data, e.g. from pd.read_csv(chunksize=)
+
+        Returns
+        --------
+        An instance of the imputation class
+
+        Examples
+        --------
+        >>>imputer = imputation('mean')
+        >>>imputer.fit_stream(pd.read_csv('train.csv', chunksize=100_000))
+        """
+        self._stream = None
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        if self._stream is None or self._stream["n_rows"] == 0:
+            raise ValueError("DataFrame cannot be empty")
+        return self
+
+    def fill(self, data_for_fill, copy=True):
         """
         Fills the missing values in each column
 
@@ -79,6 +273,10 @@ class imputation:
         --------
         data_for_fill: pandas.core.frame.DataFrame
             a pandas dataframe that we wish to fill the missing values with
+        copy: bool
+            whether to fill a copy of the dataframe. If False, the missing
+            values are filled in place and data_for_fill is returned.
+            Default True
 
         Returns
         --------
@@ -92,10 +290,627 @@ class imputation:
         >>>new = imputer.fill(test_df)
         >>>test_df2 = pd.DataFrame([[1,10,8],[5,2,6],[np.nan,3,np.nan]])
         >>>new2 = imputer.fill(test_df2)
+        >>>imputer.fill(test_df2, copy=False)
         """
         if len(self.values) != data_for_fill.shape[1]:
             raise TypeError("Columns are not Equal")
-        data = data_for_fill.copy()
-        for i in range(len(data.columns)):
-            data.iloc[:, i].fillna(self.values[i], inplace=True)
+        n_rows, n_cols = data_for_fill.shape
+        with stage("imputation.copy", n_rows, n_cols):
+            data = data_for_fill.copy() if copy else data_for_fill
+        if self.method == "knn":
+            with stage("imputation.fill", n_rows, n_cols):
+                arr = data.to_numpy(
+                    dtype=np.float64, copy=True, na_value=np.nan
+                )
+                touched = np.flatnonzero(self._fill_knn(arr).any(axis=0))
+                if touched.size:
+                    data.iloc[:, touched] = arr[:, touched]
+            return data
+        with stage("imputation.fill", n_rows, n_cols):
+            _fill_frame(data, self.values)
         return data
+
+    def fill_record(self, record):
+        """
+        Fills the missing values of a single record without any dataframe
+
+        Missing entries are None, nan or pd.NA. Dicts are filled by column
+        name through an index built when fitting, columns absent from the
+        dict are added with their fill value; tuples, lists and 1-D numpy
+        arrays are filled by position. Arrays keep their dtype unless the
+        fill values need an upcast, e.g. from int to float.
+
+        Parameters
+        --------
+        record: dict, tuple, list or numpy array
+            a single row of data
+
+        Returns
+        --------
+        The filled record, of the same type as the input
+
+        Examples
+        --------
+        >>>imputer = imputation('mean')
+        >>>imputer.fit(pd.DataFrame({'a': [1, 3], 'b': [2, np.nan]}))
+        >>>imputer.fill_record({'a': np.nan, 'b': 5})
+        {'a': 2.0, 'b': 5}
+        """
+        if self.method == "knn":
+            return self._fill_knn_record(record)
+        if isinstance(record, dict):
+            if self._index is None:
+                self._index = dict(zip(self.columns, self.values.tolist()))
+            filled = self._index.copy()
+            for key, value in record.items():
+                if not pd.isna(value):
+                    filled[key] = value
+            return filled
+        if len(record) != len(self.values):
+            raise TypeError("Columns are not Equal")
+        if isinstance(record, np.ndarray):
+            return _fill_array(record, self.values)
+        filled = [
+            fill if pd.isna(value) else value
+            for value, fill in zip(record, self.values)
+        ]
+        return filled if isinstance(record, list) else tuple(filled)
+
+    def fill_records(self, records):
+        """
+        Fills the missing values of a micro-batch of records
+
+        Parameters
+        --------
+        records: list of records or 2-D numpy array
+            records as accepted by fill_record, or an array with one row
+            per record which is filled in a single vectorized pass
+
+        Returns
+        --------
+        A list of filled records, or a filled 2-D numpy array
+
+        Examples
+        --------
+        >>>imputer.fill_records([{'a': np.nan}, (1, None)])
+        """
+        if isinstance(records, np.ndarray):
+            if records.ndim != 2 or records.shape[1] != len(self.values):
+                raise TypeError("Columns are not Equal")
+            if self.method == "knn":
+                filled = records.astype(np.float64)
+                self._fill_knn(filled)
+                return filled
+            return _fill_array(records, self.values)
+        return [self.fill_record(record) for record in records]
+
+    def _set_complete(self, complete):
+        """
+        Stores the complete rows the knn neighbours are searched among
+        """
+        self._complete = complete
+        self._trees = OrderedDict()
+
+    def _tree(self, observed):
+        """
+        Returns the spatial index over the observed columns of the complete
+        rows, building it on first use and keeping the KNN_TREES most
+        recently used
+
+        Parameters
+        --------
+        observed: numpy array
+            boolean mask of the columns the queries will have
+        """
+        key = observed.tobytes()
+        if key in self._trees:
+            self._trees.move_to_end(key)
+            return self._trees[key]
+        # scipy always ships with scikit-learn
+        from scipy.spatial import cKDTree
+
+        tree = cKDTree(
+            self._complete[:, observed],
+            balanced_tree=False,
+            compact_nodes=False,
+        )
+        self._trees[key] = tree
+        while len(self._trees) > KNN_TREES:
+            self._trees.popitem(last=False)
+        return tree
+
+    def _fill_knn(self, arr, batch_size=65_536):
+        """
+        Fills the nan entries of a float array in place with the mean of the
+        nearest complete rows
+
+        Rows are grouped by their missing pattern, and the distances of
+        each group only involve the columns it observes. Groups are queried
+        in batches against a KD-tree over those columns, kept for the next
+        fills. Groups of fewer than KNN_TREE_ROWS rows, such as single
+        records, are instead compared with every complete row, in blocks of
+        KNN_BLOCK distances, when there are at most KNN_BRUTE_ROWS complete
+        rows and no tree over their columns is kept: this costs less than
+        building the tree. Rows with nothing observed get the column means.
+
+        Parameters
+        --------
+        arr: numpy array
+            a 2-D float array, one row per record
+        batch_size: int
+            number of rows per tree query
+
+        Returns
+        --------
+        The boolean mask of the entries that were missing
+        """
+        mask = np.isnan(arr)
+        rows = np.flatnonzero(mask.any(axis=1))
+        if not rows.size:
+            return mask
+        patterns, group = np.unique(mask[rows], axis=0, return_inverse=True)
+        k = min(self.n_neighbors, len(self._complete))
+        for i, missing in enumerate(patterns):
+            members = rows[group.ravel() == i]
+            observed = ~missing
+            if not observed.any():
+                arr[np.ix_(members, missing)] = self.values[missing]
+                continue
+            targets = self._complete[:, missing]
+            use_tree = (
+                members.size >= KNN_TREE_ROWS
+                or len(self._complete) > KNN_BRUTE_ROWS
+                or observed.tobytes() in self._trees
+            )
+            if use_tree:
+                tree = self._tree(observed)
+                size = batch_size
+            else:
+                # centred so the expanded distances keep their precision
+                center = self.values[observed].astype(np.float64)
+                reference = self._complete[:, observed] - center
+                norms = np.einsum("ij,ij->i", reference, reference)
+                size = max(KNN_BLOCK // len(reference), 1)
+            for start in range(0, members.size, size):
+                batch = members[start:start + size]
+                query = arr[np.ix_(batch, observed)]
+                if use_tree:
+                    _, ind = tree.query(
+                        query,
+                        k=[k] if k == 1 else k,
+                        workers=self.n_jobs or 1,
+                    )
+                else:
+                    ind = _nearest(reference, norms, query - center, k)
+                arr[np.ix_(batch, missing)] = targets[ind].mean(axis=1)
+        return mask
+
+    def _fill_knn_record(self, record):
+        """
+        Fills a single record with the knn method, keeping its type
+        """
+        if isinstance(record, dict):
+            values = [record.get(c, np.nan) for c in self.columns]
+        else:
+            if len(record) != len(self.values):
+                raise TypeError("Columns are not Equal")
+            values = record
+        row = np.array(
+            [np.nan if pd.isna(value) else value for value in values],
+            dtype=float,
+        )
+        self._fill_knn(row.reshape(1, -1))
+        if isinstance(record, dict):
+            filled = dict(record)
+            filled.update(zip(self.columns, row.tolist()))
+            return filled
+        if isinstance(record, np.ndarray):
+            return row
+        return row.tolist() if isinstance(record, list) else tuple(row)
+
+    def save(self, path):
+        """
+        Saves the fitted method, column names and values to a file
+
+        The file is a one line JSON header holding the method and the
+        dtype, shape and offset of each array, followed by the raw buffers
+        of the column names and values (and the complete rows for knn, whose
+        trees are rebuilt on first use). It loads in tens of microseconds
+        without pickle and independently of the prepropy version that wrote
+        it.
+
+        Parameters
+        --------
+        path: str
+            the file to write
+
+        Examples
+        --------
+        >>>imputer.save('imputer.ppy')
+        """
+        if self.values is None:
+            raise ValueError("The imputation must be fitted before saving")
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "method": self.method,
+            "n_neighbors": self.n_neighbors,
+        }
+        if isinstance(self.method, dict):
+            meta["method"] = None
+        arrays = pack("columns", self.columns)
+        arrays.update(pack("values", self.values))
+        arrays["strategies"] = np.array(self.strategies)
+        if self.method == "knn":
+            arrays["complete"] = self._complete
+        write_arrays(path, meta, arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a fitted imputation saved with save
+
+        Parameters
+        --------
+        path: str
+            the file to read
+
+        Returns
+        --------
+        An instance of the imputation class
+
+        Examples
+        --------
+        >>>imputer = imputation.load('imputer.ppy')
+        """
+        meta, arrays = read_arrays(path)
+        if meta["format_version"] > FORMAT_VERSION:
+            raise ValueError("File was saved by a newer prepropy")
+        columns = unpack(arrays, "columns")
+        strategies = arrays["strategies"].tolist()
+        method = meta["method"] or dict(zip(columns.tolist(), strategies))
+        imputer = cls(method, n_neighbors=meta["n_neighbors"])
+        imputer.strategies = strategies
+        imputer._set_values(unpack(arrays, "values"), columns)
+        if "complete" in arrays:
+            imputer._set_complete(arrays["complete"])
+        return imputer
+
+    def _set_values(self, values, columns):
+        """
+        Stores the fitted values and the column name index used by
+        fill_record
+        """
+        self.values = values
+        self.columns = (
+            columns.tolist() if hasattr(columns, "tolist") else list(columns)
+        )
+        self._index = None
+
+
+def _most_frequent(counts):
+    """
+    Returns the most frequent value of a value count, the smallest on ties
+
+    Parameters
+    --------
+    counts: pandas.core.series.Series
+        the number of occurrences, indexed by value
+
+    Returns
+    --------
+    The most frequent value, nan when there are no counts
+    """
+    if counts.empty:
+        return np.nan
+    modes = counts.index[counts.to_numpy() == counts.max()]
+    try:
+        return modes.min()
+    except TypeError:
+        return modes[0]
+
+
+def _nearest(reference, norms, query, k):
+    """
+    Returns the positions of the k rows of reference nearest to each row of
+    query, in no particular order
+
+    Parameters
+    --------
+    reference: numpy array
+        a 2-D float array of the rows searched
+    norms: numpy array
+        the squared norm of each row of reference
+    query: numpy array
+        a 2-D float array of the rows whose neighbours are searched
+
+    Returns
+    --------
+    An integer array with k columns and one row per query row
+    """
+    # the squared distances, but for the squared norm of the query rows
+    # which does not change their order
+    distances = norms - 2 * (query @ reference.T)
+    if k == len(reference):
+        return np.broadcast_to(np.arange(k), distances.shape)
+    return np.argpartition(distances, k - 1, axis=1)[:, :k]
+
+
+def _fill_array(arr, values):
+    """
+    Returns a copy of an array of records with its missing entries set to
+    the values of their column
+
+    The copy keeps the dtype of arr when the values can be cast to it, and
+    is upcast otherwise, e.g. from int to float. An array without missing
+    entries is returned as an unchanged copy.
+    """
+    mask = pd.isna(arr)
+    if not mask.any():
+        return arr.copy()
+    dtype = arr.dtype
+    if not np.can_cast(values.dtype, dtype, "same_kind"):
+        dtype = np.result_type(dtype, values.dtype)
+    filled = arr.astype(dtype)
+    np.copyto(filled, values, where=mask)
+    return filled
+
+
+def _as_values(values):
+    """
+    Packs per-column values into an array, numeric when they all are
+    """
+    return pd.Series(values, dtype=object).infer_objects().to_numpy()
+
+
+def _fit_values(method, data):
+    """
+    Calculates the value to be imputated for each column of a dataframe
+
+    Parameters
+    --------
+    method: str
+        one of mean, median, most_frequent
+    data: pandas.core.frame.DataFrame
+        a pandas dataframe, or a block of its columns
+
+    Returns
+    --------
+    A numpy array with one value per column
+    """
+    if method == "mean":
+        return data.mean().values
+    if method == "median":
+        return data.median().values
+    return _as_values(
+        [
+            _most_frequent(data.iloc[:, i].value_counts())
+            for i in range(data.shape[1])
+        ]
+    )
+
+
+def _numeric_columns(data):
+    """
+    Returns a boolean mask of the numeric (non boolean) columns, read from
+    the dtypes alone
+    """
+    return np.array(
+        [getattr(dtype, "kind", "O") in "iufc" for dtype in data.dtypes],
+        dtype=bool,
+    )
+
+
+def _resolve_strategies(method, data):
+    """
+    Returns the strategy of each column of a dataframe
+
+    Parameters
+    --------
+    method: str or dict
+        the method given to the imputation class, other than knn
+    data: pandas.core.frame.DataFrame
+        a pandas dataframe
+
+    Returns
+    --------
+    A list with one of mean, median, most_frequent per column
+    """
+    numeric = _numeric_columns(data)
+    if method in STRATEGIES:
+        if method != "most_frequent" and not numeric.all():
+            raise TypeError("All values in dataframe must be numeric")
+        return [method] * data.shape[1]
+    mapping = method if isinstance(method, dict) else {}
+    unknown = [column for column in mapping if column not in data.columns]
+    if unknown:
+        raise KeyError(f"Columns {unknown} are not in the dataframe")
+    strategies = []
+    for column, is_numeric in zip(data.columns, numeric):
+        strategy = mapping.get(
+            column, "mean" if is_numeric else "most_frequent"
+        )
+        if strategy != "most_frequent" and not is_numeric:
+            raise TypeError(f"Column {column} must be numeric for {strategy}")
+        strategies.append(strategy)
+    return strategies
+
+
+def _group_strategies(strategies):
+    """
+    Maps each strategy to the positions of the columns using it
+    """
+    strategies = np.array(strategies)
+    return {
+        strategy: np.flatnonzero(strategies == strategy)
+        for strategy in STRATEGIES
+        if (strategies == strategy).any()
+    }
+
+
+def _effective_n_jobs(n_jobs, n_tasks):
+    """
+    Resolves n_jobs to a number of processes, at most one per task (column
+    or partition)
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        n_jobs = max(os.cpu_count() + 1 + n_jobs, 1)
+    return max(min(n_jobs, n_tasks), 1)
+
+
+def _fit_parallel(method, data, n_jobs):
+    """
+    Calculates the values column block by column block in a process pool
+
+    Numeric columns are copied once, per dtype, into a Fortran ordered
+    shared memory buffer so each worker reads its contiguous block in place,
+    with pd.NA read as nan; only the remaining (object and extension) blocks
+    are pickled.
+
+    Parameters
+    --------
+    method: str
+        one of mean, median, most_frequent
+    data: pandas.core.frame.DataFrame
+        a pandas dataframe
+    n_jobs: int
+        number of processes
+
+    Returns
+    --------
+    A numpy array with one value per column, in column order
+    """
+    if method in ["mean", "median"]:
+        groups = {np.dtype(np.float64): np.arange(data.shape[1])}
+    else:
+        dtypes = data.dtypes.to_numpy()
+        groups = {
+            dtype: np.flatnonzero(dtypes == dtype) for dtype in set(dtypes)
+        }
+    # imported here so that only parallel fits pay for multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    values = [None] * data.shape[1]
+    buffers = []
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = []
+            for dtype, pos in groups.items():
+                if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+                    columns = data.iloc[:, pos]
+                    if dtype.kind == "f":
+                        arr = columns.to_numpy(dtype=dtype, na_value=np.nan)
+                    else:
+                        arr = columns.to_numpy(dtype=dtype)
+                    shm = shared_memory.SharedMemory(
+                        create=True, size=max(arr.nbytes, 1)
+                    )
+                    buffers.append(shm)
+                    shared = np.ndarray(
+                        arr.shape, dtype=dtype, buffer=shm.buf, order="F"
+                    )
+                    shared[:] = arr
+                    del columns, arr, shared
+                    for block in np.array_split(np.arange(len(pos)), n_jobs):
+                        if block.size:
+                            futures.append(
+                                (
+                                    pos[block],
+                                    pool.submit(
+                                        _fit_shared_block,
+                                        method,
+                                        shm.name,
+                                        (data.shape[0], len(pos)),
+                                        dtype,
+                                        block[0],
+                                        block[-1] + 1,
+                                    ),
+                                )
+                            )
+                else:
+                    for block in np.array_split(pos, n_jobs):
+                        if block.size:
+                            futures.append(
+                                (
+                                    block,
+                                    pool.submit(
+                                        _fit_values,
+                                        method,
+                                        data.iloc[:, block],
+                                    ),
+                                )
+                            )
+            for block, future in futures:
+                for i, value in zip(block, future.result()):
+                    values[i] = value
+    finally:
+        for shm in buffers:
+            shm.close()
+            shm.unlink()
+    return _as_values(values)
+
+
+def _fit_shared_block(method, name, shape, dtype, start, stop):
+    """
+    Worker side of _fit_parallel: fits columns start:stop of a shared buffer
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf, order="F")
+        block = pd.DataFrame(arr[:, start:stop], copy=False)
+        values = _fit_values(method, block)
+        del arr, block
+    finally:
+        shm.close()
+    return values
+
+
+def _fill_frame(data, values):
+    """
+    Fills the missing values of a dataframe in place, one dtype at a time
+
+    Float and object columns sharing a dtype are filled with a single masked
+    copy over their NumPy block, so only the missing positions are written.
+    Blocks that are not views of the dataframe are written back column by
+    column for the touched columns only, which keeps their dtype. Datetime,
+    categorical and extension columns are filled with fillna, column by
+    column, so they keep their dtype too.
+
+    Parameters
+    --------
+    data: pandas.core.frame.DataFrame
+        a pandas dataframe to be filled in place
+    values: numpy array
+        the value to be imputed for each column, by position
+    """
+    values = np.asarray(values, dtype=object)
+    dtypes = data.dtypes.to_numpy()
+    for dtype in pd.unique(dtypes):
+        pos = np.flatnonzero(dtypes == dtype)
+        if not isinstance(dtype, np.dtype) or dtype.kind not in "fO":
+            for i in pos:
+                column = data.iloc[:, i]
+                if column.hasnans:
+                    data.iloc[:, i] = column.fillna(values[i])
+            continue
+        if len(pos) == data.shape[1]:
+            arr = data.to_numpy()
+        else:
+            arr = data.iloc[:, pos].to_numpy()
+        mask = pd.isna(arr)
+        if not mask.any():
+            continue
+        if not arr.flags.writeable:
+            arr = arr.copy()
+        fill = values[pos]
+        if arr.dtype != object:
+            fill = fill.astype(arr.dtype)
+        np.copyto(arr, fill, where=mask)
+        if np.may_share_memory(arr, data.iloc[:, pos[0]].to_numpy()):
+            continue
+        for j in np.flatnonzero(mask.any(axis=0)):
+            data.iloc[:, pos[j]] = arr[:, j]
@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+
+from prepropy.hooks import stage
+from prepropy.scaler import _feature_array
+
+
+class Pipeline:
+    """
+    Fills missing values then scales, in one pass over each column
+
+    The fitted imputation values and scaling statistics are composed per
+    feature: since scaling keeps nan as nan, each scaled feature is copied
+    once into a float array, scaled in place with the arithmetic of the
+    Scaler, and its nan are then set to the scaled fill value computed once
+    when composing. The other columns are only copied when they have
+    missing values to fill. Chaining imputation.fill and Scaler.transform
+    instead copies the whole dataframe to fill it, then the features to
+    scale them.
+
+    Parameters
+    --------
+    imputer: imputation
+        an imputer with the method mean, median, most_frequent, auto or a
+        dict of methods; knn fills rows from their neighbours and cannot
+        be composed
+    scaler: Scaler
+        the scaler applied to its features after filling them
+
+    Examples
+    --------
+    >>>pipe = Pipeline(imputation("mean"), Scaler()).fit(train, ["age"])
+    >>>scaled = pipe.transform(test)
+    >>>for chunk in pipe.transform_stream(pd.read_csv("score.csv",
+    ...                                               chunksize=10**5)):
+    ...     predict(chunk)
+    """
+
+    def __init__(self, imputer, scaler):
+        if imputer.method == "knn":
+            raise ValueError("knn imputation cannot be composed")
+        self.imputer = imputer
+        self.scaler = scaler
+        self._fill = None
+
+    def fit(self, X, scale_features):
+        """
+        Fits the imputer on X, then the scaler on the filled features
+
+        The features are filled in their float copy, so no copy of the
+        whole dataframe is made.
+
+        Parameters
+        --------
+        X : pandas.core.frame.DataFrame
+            The training data
+        scale_features: list of strings
+            The list of numerical features to be scaled
+
+        Returns
+        --------
+        Pipeline
+            the fitted pipeline
+        """
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("Input data must be a Pandas Dataframe")
+        if len(scale_features) == 0:
+            raise ValueError("Inputs cannot be empty")
+        self.imputer.fit(X)
+        features = list(scale_features)
+        with stage("pipeline.convert", len(X), len(features)):
+            arr = _feature_array(X, features, self.scaler.coerce)
+            fill = self._feature_values(features)
+            np.copyto(arr, fill, where=np.isnan(arr))
+        self.scaler._fit_array(arr, features)
+        self._fill = None
+        return self
+
+    def transform(self, X, copy=True):
+        """
+        Fills the missing values of X and scales its fitted features
+
+        Parameters
+        --------
+        X : pandas.core.frame.DataFrame
+            The data, with the columns the imputer was fitted on
+        copy: bool
+            Whether the columns that are neither scaled nor filled are
+            copied. Default True
+
+        Returns
+        --------
+        pandas.core.frame.DataFrame
+            X filled, with the features scaled
+        """
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("Input data must be a Pandas Dataframe")
+        if self._fill is None:
+            self._compose()
+        if list(X.columns) != self.imputer.columns:
+            raise TypeError("Columns are not Equal")
+        scaler = self.scaler
+        n_rows, n_features = len(X), len(scaler.features)
+        with stage("pipeline.convert", n_rows, n_features):
+            arr = _feature_array(
+                X, scaler.features, scaler.coerce, scaler.dtype
+            )
+        with stage("pipeline.apply", n_rows, n_features):
+            scaler._apply(arr)
+            np.copyto(arr, self._fill, where=np.isnan(arr))
+        with stage("pipeline.assemble", n_rows, X.shape[1]):
+            position = {f: i for i, f in enumerate(scaler.features)}
+            columns = []
+            for value, (name, column) in zip(self.imputer.values, X.items()):
+                if name in position:
+                    column = pd.Series(
+                        arr[:, position[name]], index=X.index, name=name
+                    )
+                elif column.hasnans:
+                    column = column.fillna(value)
+                elif copy:
+                    column = column.copy()
+                columns.append(column)
+            # concatenating the columns keeps each of them as its own block
+            X_new = pd.concat(columns, axis=1, copy=False)
+            X_new.columns = X.columns
+        return X_new
+
+    def transform_stream(self, chunks, copy=False):
+        """
+        Fills and scales an iterable of chunks, one chunk at a time
+
+        Parameters
+        --------
+        chunks: iterable of pandas.core.frame.DataFrame
+            the chunks to transform, e.g. from pd.read_csv(chunksize=)
+        copy: bool
+            Whether the columns that are neither scaled nor filled are
+            copied. Default False, they are shared with the input chunks
+
+        Yields
+        --------
+        pandas.core.frame.DataFrame
+            each chunk filled, with the features scaled
+        """
+        for chunk in chunks:
+            yield self.transform(chunk, copy=copy)
+
+    def _compose(self):
+        """
+        Computes the scaled fill value of each feature
+        """
+        if self.imputer.values is None:
+            raise ValueError("The imputer must be fitted before transforming")
+        if self.scaler._operands is None:
+            raise ValueError("The scaler must be fitted before transforming")
+        fill = self._feature_values(self.scaler.features)
+        arr = np.array([fill], dtype=self.scaler.dtype)
+        self._fill = self.scaler._apply(arr)[0]
+
+    def _feature_values(self, features):
+        """
+        Returns the imputation values of the features as floats
+        """
+        index = {column: i for i, column in enumerate(self.imputer.columns)}
+        missing = [feature for feature in features if feature not in index]
+        if missing:
+            raise ValueError(f"Features {missing} were not imputed")
+        values = self.imputer.values[[index[f] for f in features]]
+        try:
+            return values.astype(np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Features should have only numeric values")
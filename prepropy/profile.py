@@ -0,0 +1,354 @@
+import numpy as np
+import pandas as pd
+
+from prepropy.sketch import HyperLogLog, SpaceSaving
+from prepropy.stats import CrossProducts, Moments
+
+# the number of rows counted at a time by the approximate sketches
+SKETCH_ROWS = 65536
+
+
+class Profile:
+    """
+    Column profile of a dataframe computed in a single pass
+
+    One pass over the rows, in blocks of chunk_size rows, collects for every
+    feature its missing count and, for numeric features, the count, mean,
+    variance, min and max (see Moments). The class counts of the target are
+    taken with a single value_counts. Numeric columns are read through
+    views of the dataframe and converted block by block, so no copy of the
+    whole dataframe is made. With correlation, the same blocks also feed
+    the cross-products of the numeric features (see CrossProducts).
+    With approximate, every column also gets a HyperLogLog distinct count
+    and a SpaceSaving report of its most frequent values, and the target
+    classes are counted by sketches too, so high cardinality columns are
+    profiled in bounded memory. Profiles of other rows can be merged in.
+
+    Parameters
+    --------
+    target: string
+        the target column, profiled through its class counts only.
+        Default None
+    chunk_size: int
+        the number of rows converted to float at a time. Default 4096
+    correlation: bool
+        whether to accumulate the cross-products of the numeric features
+        for correlation(). Default False
+    approximate: bool
+        whether to sketch the distinct counts and most frequent values of
+        every column and count the target classes approximately.
+        Default False
+    top_k: int
+        the number of most frequent values kept per column with
+        approximate, see SpaceSaving. Default 20
+
+    Attributes
+    --------
+    features: list
+        the profiled columns, in dataframe order
+    dtypes: list
+        the dtype of each feature
+    numeric: numpy array
+        whether each feature is numeric (bool excluded)
+    n_rows: int
+        the number of rows profiled
+    missing: numpy array
+        the number of missing values of each feature
+    moments: Moments
+        the moments of the numeric features
+    class_counts: pandas.Series
+        the number of rows of each target class, missing included; with
+        approximate, the top_k classes and their estimated counts
+    target_missing: int
+        the number of rows without a target
+    distinct: list
+        the HyperLogLog sketch of each feature, None without approximate
+    top: list
+        the SpaceSaving sketch of each feature, None without approximate
+    cross: CrossProducts
+        the cross-products of the numeric features, None without
+        correlation
+
+    Examples
+    --------
+    >>>profile = Profile("quality").update(df)
+    >>>profile.summary()
+    """
+
+    def __init__(
+        self,
+        target=None,
+        chunk_size=4096,
+        correlation=False,
+        approximate=False,
+        top_k=20,
+    ):
+        self.target = target
+        self.chunk_size = chunk_size
+        self.approximate = approximate
+        self.top_k = top_k
+        self.features = None
+        self.dtypes = None
+        self.numeric = None
+        self.n_rows = 0
+        self.missing = None
+        self.moments = Moments()
+        self.class_counts = None
+        self.target_missing = 0
+        self.cross = CrossProducts() if correlation else None
+        self.distinct = None
+        self.top = None
+        if approximate:
+            self._class_distinct = HyperLogLog()
+            self._class_top = SpaceSaving(top_k)
+
+    def update(self, df):
+        """
+        Adds the rows of a dataframe to the profile
+
+        Parameters
+        --------
+        df : pandas.DataFrame
+            the rows to profile, with the same columns on every call
+
+        Returns
+        --------
+        The profile itself
+        """
+        features = [col for col in df.columns if col != self.target]
+        if self.features is None:
+            self._set_features(features, [df[col].dtype for col in features])
+        elif features != self.features:
+            raise ValueError("Columns differ from the profiled columns")
+        columns = []
+        for i, col in enumerate(features):
+            if self.numeric[i]:
+                columns.append(_float_view(df[col]))
+            else:
+                self.missing[i] += df[col].isna().sum()
+        if columns:
+            moments = Moments()
+            for arr in _float_blocks(columns, len(df), self.chunk_size):
+                moments.update(arr)
+                if self.cross is not None:
+                    self.cross.update(arr)
+            if moments.count is not None:
+                self.missing[self.numeric] += len(df) - moments.count.astype(
+                    np.int64
+                )
+                self.moments.merge(moments)
+        if self.approximate:
+            for i, col in enumerate(features):
+                _sketch(df[col], self.distinct[i], self.top[i])
+        self.n_rows += len(df)
+        if self.target is not None:
+            labels = df[self.target]
+            self.target_missing += int(labels.isna().sum())
+            if self.approximate:
+                _sketch(labels, self._class_distinct, self._class_top)
+                self.class_counts = self._class_top.counts
+            else:
+                self._add_class_counts(labels.value_counts(dropna=False))
+        return self
+
+    def merge(self, other):
+        """
+        Merges the profile of other rows with the same columns
+
+        Parameters
+        --------
+        other: Profile
+            a profile of other rows
+
+        Returns
+        --------
+        The profile itself
+        """
+        if other.features is None:
+            return self
+        if other.approximate != self.approximate:
+            raise ValueError("Cannot merge exact and approximate profiles")
+        if self.features is None:
+            self._set_features(other.features, other.dtypes)
+        elif other.features != self.features:
+            raise ValueError("Columns differ from the profiled columns")
+        self.n_rows += other.n_rows
+        self.missing += other.missing
+        self.moments.merge(other.moments)
+        if self.cross is not None and other.cross is not None:
+            self.cross.merge(other.cross)
+        if self.approximate:
+            for mine, theirs in zip(self.distinct, other.distinct):
+                mine.merge(theirs)
+            for mine, theirs in zip(self.top, other.top):
+                mine.merge(theirs)
+        self.target_missing += other.target_missing
+        if other.class_counts is not None and self.approximate:
+            self._class_distinct.merge(other._class_distinct)
+            self.class_counts = self._class_top.merge(other._class_top).counts
+        elif other.class_counts is not None:
+            self._add_class_counts(other.class_counts)
+        return self
+
+    def _set_features(self, features, dtypes):
+        """
+        Sets the profiled columns on the first update or merge
+        """
+        self.features = features
+        self.dtypes = dtypes
+        self.numeric = np.array([_is_numeric(d) for d in dtypes], dtype=bool)
+        self.missing = np.zeros(len(features), dtype=np.int64)
+        if self.approximate:
+            self.distinct = [HyperLogLog() for _ in features]
+            self.top = [SpaceSaving(self.top_k) for _ in features]
+
+    def _add_class_counts(self, counts):
+        """
+        Adds target class counts, keeping the most frequent classes first
+        """
+        if self.class_counts is not None:
+            counts = self.class_counts.add(counts, fill_value=0)
+            counts = counts.astype(np.int64).sort_values(
+                ascending=False, kind="stable"
+            )
+        self.class_counts = counts
+
+    @property
+    def num_features(self):
+        """
+        The numeric features, in dataframe order
+        """
+        return [f for f, num in zip(self.features, self.numeric) if num]
+
+    @property
+    def cat_features(self):
+        """
+        The features that are not numeric, in dataframe order
+        """
+        return [f for f, num in zip(self.features, self.numeric) if not num]
+
+    def n_classes(self):
+        """
+        Returns the number of target classes, missing included; estimated
+        with approximate
+        """
+        if self.approximate:
+            return self._class_distinct.count() + (self.target_missing > 0)
+        return len(self.class_counts)
+
+    def class_ratio(self):
+        """
+        Returns the share of each target class among the non missing labels,
+        the most frequent first
+        """
+        counts = self.class_counts[self.class_counts.index.notna()]
+        return counts / (self.n_rows - self.target_missing)
+
+    def top_values(self):
+        """
+        Returns a dict with the estimated counts of the most frequent values
+        of each feature, see SpaceSaving
+        """
+        if not self.approximate:
+            raise ValueError("Profile was built without approximate")
+        return {f: top.counts for f, top in zip(self.features, self.top)}
+
+    def correlation(self):
+        """
+        Returns the pairwise complete Pearson correlations of the numeric
+        features as a dataframe, see CrossProducts.corr
+        """
+        num_fea = self.num_features
+        if self.cross is None:
+            raise ValueError("Profile was built without correlation")
+        if self.cross.shift is None:
+            return pd.DataFrame(np.nan, index=num_fea, columns=num_fea)
+        return pd.DataFrame(self.cross.corr(), index=num_fea, columns=num_fea)
+
+    def summary(self):
+        """
+        Returns a dataframe with one row per feature: dtype, missing, count,
+        the estimated distinct count with approximate, mean, std (with one
+        degree of freedom), min and max
+        """
+        summary = pd.DataFrame(
+            {
+                "dtype": self.dtypes,
+                "missing": self.missing,
+                "count": self.n_rows - self.missing,
+            },
+            index=pd.Index(self.features),
+        )
+        if self.approximate:
+            summary["distinct"] = [hll.count() for hll in self.distinct]
+        for name in ["mean", "std", "min", "max"]:
+            summary[name] = np.nan
+        moments = self.moments
+        if moments.count is not None:
+            count = moments.count
+            with np.errstate(divide="ignore", invalid="ignore"):
+                std = np.sqrt(moments.m2 / (count - 1))
+            has_values = count > 0
+            summary.loc[self.numeric, "mean"] = np.where(
+                has_values, moments.mean, np.nan
+            )
+            summary.loc[self.numeric, "std"] = np.where(
+                count > 1, std, np.nan
+            )
+            summary.loc[self.numeric, "min"] = np.where(
+                has_values, moments.min, np.nan
+            )
+            summary.loc[self.numeric, "max"] = np.where(
+                has_values, moments.max, np.nan
+            )
+        return summary
+
+
+def _is_numeric(dtype):
+    """
+    Whether a dtype holds real numbers: ints, floats and their nullable
+    versions, but not bools
+    """
+    return (
+        pd.api.types.is_numeric_dtype(dtype)
+        and not pd.api.types.is_bool_dtype(dtype)
+        and not pd.api.types.is_complex_dtype(dtype)
+    )
+
+
+def _float_view(column):
+    """
+    Returns the values of a numeric column as a 1-D numpy array, a view of
+    the dataframe for numpy dtypes and a float copy with nan otherwise
+    """
+    if isinstance(column.dtype, np.dtype):
+        return column.to_numpy()
+    return column.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _sketch(column, distinct, top):
+    """
+    Adds a column to its distinct count and most frequent values sketches,
+    SKETCH_ROWS rows at a time so each value_counts stays small
+    """
+    for start in range(0, len(column), SKETCH_ROWS):
+        counts = column.iloc[start: start + SKETCH_ROWS].value_counts(
+            dropna=False
+        )
+        distinct.update(counts.index)
+        top.update_counts(counts)
+
+
+def _float_blocks(columns, n_rows, chunk_size):
+    """
+    Yields the columns converted to float one block of chunk_size rows at a
+    time, into a column major buffer that stays in cache and is reused for
+    every block
+    """
+    buffer = np.empty((chunk_size, len(columns)), order="F")
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        arr = buffer[: stop - start]
+        for j, column in enumerate(columns):
+            arr[:, j] = column[start:stop]
+        yield arr
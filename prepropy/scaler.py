@@ -1,15 +1,824 @@
+import os
+
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.preprocessing import MaxAbsScaler
-from sklearn.preprocessing import MinMaxScaler
+
+from prepropy.hooks import stage
+from prepropy.imputation import _effective_n_jobs
+from prepropy.storage import FORMAT_VERSION, pack, unpack
+from prepropy.storage import read_arrays, write_arrays
+from prepropy.stats import ColumnQuantiles, Moments
+
+SCALERS = [
+    "StandardScaler",
+    "MinMaxScaler",
+    "MaxAbsScaler",
+    "RobustScaler",
+    "QuantileTransformer",
+]
+
+# scalers fitted from quantile sketches, only with the numpy engine
+SKETCH_SCALERS = ["RobustScaler", "QuantileTransformer"]
+
+ENGINES = ["numpy", "sklearn"]
+
+
+class Scaler:
+    """
+    A scaler fitted once on the training data and reused on any dataframe
+
+    Every scaler type but QuantileTransformer is stored as a center and a
+    scale per feature, the scaled value being (x - center_) / scale_.
+    Transforms only apply this arithmetic with in-place ufuncs on one float
+    copy of the scaled features, in the same operation order as
+    scikit-learn.
+
+    The numpy engine computes the statistics itself with the same formulas
+    as scikit-learn (nan-aware sums, variance with the same correction term
+    and constant feature handling) without importing it; the sklearn engine
+    fits the scikit-learn estimators. Both agree to floating point
+    tolerance, and exactly on a single fit.
+
+    RobustScaler (centered on the median, divided by the interquartile
+    range) and QuantileTransformer (mapped to a uniform distribution on
+    [0, 1] through the quantile table quantiles_) are fitted from
+    per-column quantile sketches, in bounded memory and without sorting
+    whole columns, so only the numpy engine offers them. Their quantiles
+    are exact up to sketch_size values per feature and otherwise within a
+    rank error of about 2 / sketch_size.
+
+    Parameters
+    --------
+    scaler_type: string
+        The type of scaling to perform on the numerical columns.
+        Default "StandardScaler"
+    coerce: bool
+        Whether non numeric values become nan instead of raising a
+        ValueError. Default False
+    engine: string
+        "numpy" or "sklearn", how the statistics are computed.
+        Default "numpy"
+    dtype: numpy dtype
+        The float type of the scaled features, np.float32 halves the memory
+        of the output. Default np.float64
+    n_quantiles: int
+        The number of quantiles of the QuantileTransformer table.
+        Default 1000
+    sketch_size: int
+        The capacity of the quantile sketches. Default 1000
+
+    Attributes
+    --------
+    features: list of strings
+        The features the scaler was fitted on
+    center_: numpy array
+        The value subtracted from each feature
+    scale_: numpy array
+        The value each centered feature is divided by
+    quantiles_: numpy array
+        For QuantileTransformer, the value of each feature at n_quantiles
+        evenly spaced quantiles, one column per feature
+    n_samples_seen_: int
+        The number of rows the scaler was fitted on
+
+    Examples
+    --------
+    >>>sc = Scaler("MinMaxScaler").fit(X_train, ["age", "net_worth"])
+    >>>X_new_scaled = sc.transform(X_new)
+    """
+
+    def __init__(
+        self,
+        scaler_type="StandardScaler",
+        coerce=False,
+        engine="numpy",
+        dtype=np.float64,
+        n_quantiles=1000,
+        sketch_size=1000,
+    ):
+        if scaler_type not in SCALERS:
+            raise KeyError(
+                'Please use scaler "StandardScaler", "MinMaxScaler", "MaxAbsScaler", "RobustScaler", "QuantileTransformer"'  # noqa: E501
+            )
+        if engine not in ENGINES:
+            raise KeyError('Please use engine "numpy" or "sklearn"')
+        if engine == "sklearn" and scaler_type in SKETCH_SCALERS:
+            raise ValueError(
+                f"{scaler_type} is only available with the numpy engine"
+            )
+        if np.dtype(dtype) not in [np.float32, np.float64]:
+            raise TypeError("dtype must be np.float32 or np.float64")
+        self.scaler_type = scaler_type
+        self.coerce = coerce
+        self.engine = engine
+        self.dtype = np.dtype(dtype)
+        self.n_quantiles = n_quantiles
+        self.sketch_size = sketch_size
+        self.features = None
+        self.center_ = None
+        self.scale_ = None
+        self.quantiles_ = None
+        self.n_samples_seen_ = 0
+        self._state = None
+        self._operands = None
+
+    def fit(self, X, scale_features):
+        """
+        Computes the center and scale of each feature
+
+        Parameters
+        --------
+        X : pandas.core.frame.DataFrame
+            The training data
+        scale_features: list of strings
+            The list of numerical features to be scaled
+
+        Returns
+        --------
+        Scaler
+            the fitted scaler
+        """
+        self._state = None
+        self.n_samples_seen_ = 0
+        return self.partial_fit(X, scale_features)
+
+    def partial_fit(self, X, scale_features=None):
+        """
+        Updates the center and scale with one more batch of training data
+
+        Parameters
+        --------
+        X : pandas.core.frame.DataFrame
+            The next batch of training data
+        scale_features: list of strings
+            The features to scale, required on the first call only
+
+        Returns
+        --------
+        Scaler
+            the fitted scaler
+        """
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("Input data must be a Pandas Dataframe")
+        if self._state is None:
+            if self.n_samples_seen_:
+                raise ValueError(
+                    "A loaded scaler cannot be fitted further, refit it"
+                )
+            if scale_features is None or len(scale_features) == 0:
+                raise ValueError("Inputs cannot be empty")
+            self.features = list(scale_features)
+        elif scale_features is not None and (
+            list(scale_features) != self.features
+        ):
+            raise ValueError("Features differ from the fitted features")
+        with stage("scaler.convert", len(X), len(self.features)):
+            arr = _feature_array(X, self.features, self.coerce)
+        return self._partial_fit_array(arr)
+
+    def _fit_array(self, arr, features):
+        """
+        Fits the statistics on a 2-D float array of the given features
+        """
+        self.features = list(features)
+        self._state = None
+        self.n_samples_seen_ = 0
+        return self._partial_fit_array(arr)
+
+    def _partial_fit_array(self, arr):
+        """
+        Updates the statistics with a 2-D float array of the features
+        """
+        with stage("scaler.fit", *arr.shape):
+            if self.engine == "sklearn":
+                self._partial_fit_sklearn(arr)
+            else:
+                if self._state is None:
+                    self._state = self._new_state()
+                self._state.update(arr)
+                self._set_state_stats()
+        return self
+
+    def _new_state(self):
+        """
+        Returns the empty running statistics of the numpy engine
+        """
+        if self.scaler_type in SKETCH_SCALERS:
+            return ColumnQuantiles(self.sketch_size)
+        return Moments()
+
+    def _set_state_stats(self):
+        """
+        Sets the statistics from the running state of the numpy engine
+        """
+        if self.scaler_type == "QuantileTransformer":
+            self._set_quantiles(
+                _sketch_quantiles(self.n_quantiles, self._state)
+            )
+        elif self.scaler_type == "RobustScaler":
+            q25, median, q75 = self._state.quantile([0.25, 0.5, 0.75])
+            self._set_stats(median, _handle_zeros(q75 - q25))
+        else:
+            self._set_stats(*_moments_stats(self.scaler_type, self._state))
+        self.n_samples_seen_ = int(np.max(self._state.count))
+
+    def fit_stream(self, chunks, scale_features):
+        """
+        Computes the center and scale of each feature from an iterable of
+        chunks
+
+        Parameters
+        --------
+        chunks: iterable of pandas.core.frame.DataFrame
+            the chunks making up the training data, e.g. from
+            pd.read_csv(chunksize=)
+        scale_features: list of strings
+            The list of numerical features to be scaled
+
+        Returns
+        --------
+        Scaler
+            the fitted scaler
+        """
+        self._state = None
+        self.n_samples_seen_ = 0
+        for chunk in chunks:
+            self.partial_fit(chunk, scale_features)
+        if self._state is None:
+            raise ValueError("Inputs cannot be empty")
+        return self
+
+    def fit_partitions(self, partitions, scale_features, n_jobs=None):
+        """
+        Fits each partition of the training data separately and merges the
+        statistics
+
+        Every partition is reduced to its moments (count, mean, variance,
+        min and max) or its quantile sketches on its own, in a pool of
+        processes when n_jobs is set, so only these few arrays per
+        partition are sent back. Merging moments gives the statistics of a
+        single fit to floating point tolerance. Only the numpy engine can
+        be fitted this way.
+
+        Parameters
+        --------
+        partitions: list or str
+            dataframes or paths to .parquet or CSV files, or a directory
+            whose files (except names starting with "." or "_") are the
+            partitions
+        scale_features: list of strings
+            The list of numerical features to be scaled
+        n_jobs: int
+            the number of processes, -1 for all the cores. Default None,
+            fitting the partitions one after the other
+
+        Returns
+        --------
+        Scaler
+            the fitted scaler
+
+        Examples
+        --------
+        >>>sc = Scaler().fit_partitions("train_parquet/", ["age"], n_jobs=-1)
+        """
+        if self.engine != "numpy":
+            raise ValueError("Only the numpy engine can fit partitions")
+        partitions = _list_partitions(partitions)
+        if len(partitions) == 0 or len(scale_features) == 0:
+            raise ValueError("Inputs cannot be empty")
+        features = list(scale_features)
+        n_jobs = _effective_n_jobs(n_jobs, len(partitions))
+        args = (
+            self.scaler_type,
+            self.coerce,
+            self.n_quantiles,
+            self.sketch_size,
+            features,
+        )
+        if n_jobs == 1:
+            results = [_fit_partition(part, *args) for part in partitions]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                results = list(
+                    pool.map(
+                        _fit_partition,
+                        partitions,
+                        *[[arg] * len(partitions) for arg in args],
+                    )
+                )
+        self.features = features
+        self._state = self._new_state()
+        for state in results:
+            self._state.merge(state)
+        self._set_state_stats()
+        return self
+
+    def merge(self, other):
+        """
+        Merges the statistics of a scaler fitted on other rows
+
+        Parameters
+        --------
+        other: Scaler
+            a numpy engine scaler of the same type fitted on the same
+            features
+
+        Returns
+        --------
+        Scaler
+            the scaler itself, fitted on the rows of both
+        """
+        if self._state is None or other._state is None:
+            raise ValueError("Both scalers must be fitted")
+        if self.engine != "numpy" or other.engine != "numpy":
+            raise ValueError("Only numpy engine scalers can be merged")
+        if (
+            other.scaler_type != self.scaler_type
+            or other.features != self.features
+        ):
+            raise ValueError("Scalers differ in type or features")
+        self._state.merge(other._state)
+        self._set_state_stats()
+        return self
+
+    def _partial_fit_sklearn(self, arr):
+        """
+        Updates the statistics through the scikit-learn estimators
+        """
+        if self._state is None:
+            from sklearn import preprocessing
+
+            self._state = getattr(preprocessing, self.scaler_type)()
+        est = self._state.partial_fit(arr)
+        if self.scaler_type == "StandardScaler":
+            self._set_stats(est.mean_, est.scale_)
+        elif self.scaler_type == "MinMaxScaler":
+            self._set_stats(est.data_min_, _handle_zeros(est.data_range_))
+        else:
+            self._set_stats(np.zeros_like(est.scale_), est.scale_)
+        self.n_samples_seen_ = int(np.max(est.n_samples_seen_))
+
+    def transform(self, X, copy=True, inplace=False):
+        """
+        Scales the fitted features of a dataframe
+
+        Only the scaled features are materialized as new arrays. By default
+        the other columns are copied as well; with copy=False the returned
+        dataframe shares them with X, and with inplace=True the features of
+        X itself are overwritten.
+
+        Parameters
+        --------
+        X : pandas.core.frame.DataFrame
+            The data to scale, containing the fitted features
+        copy: bool
+            Whether the columns that are not scaled are copied. Default True
+        inplace: bool
+            Whether to scale X in place and return it. Default False
+
+        Returns
+        --------
+        pandas.core.frame.DataFrame
+            X with the features scaled
+        """
+        if self._operands is None:
+            raise ValueError("The scaler must be fitted before transforming")
+        if not isinstance(X, pd.DataFrame):
+            raise TypeError("Input data must be a Pandas Dataframe")
+        n_rows, n_features = len(X), len(self.features)
+        with stage("scaler.convert", n_rows, n_features):
+            arr = _feature_array(X, self.features, self.coerce, self.dtype)
+        with stage("scaler.apply", n_rows, n_features):
+            arr = self._apply(arr)
+        with stage("scaler.assemble", n_rows, X.shape[1]):
+            if inplace:
+                _assign_columns(X, self.features, arr)
+                return X
+            return _with_columns(X, self.features, arr, copy)
+
+    def transform_stream(self, chunks, copy=False):
+        """
+        Scales an iterable of chunks, one chunk at a time
+
+        Only one chunk is held at a time, so memory stays proportional to
+        the chunk size however large the data is.
+
+        Parameters
+        --------
+        chunks: iterable of pandas.core.frame.DataFrame
+            the chunks to scale, e.g. from pd.read_csv(chunksize=)
+        copy: bool
+            Whether the columns that are not scaled are copied. Default
+            False, the scaled chunks share them with the input chunks
+
+        Yields
+        --------
+        pandas.core.frame.DataFrame
+            each chunk with the features scaled
+
+        Examples
+        --------
+        >>>sc = Scaler().fit_stream(pd.read_csv("train.csv", chunksize=10**5),
+        ...                         ["age", "net_worth"])
+        >>>for chunk in sc.transform_stream(pd.read_csv("score.csv",
+        ...                                             chunksize=10**5)):
+        ...     predict(chunk)
+        """
+        for chunk in chunks:
+            yield self.transform(chunk, copy=copy)
+
+    def transform_to_file(self, chunks, path, **kwargs):
+        """
+        Scales an iterable of chunks and writes them to a single file
+
+        Files ending in .parquet are written with pyarrow, one row group per
+        chunk, every chunk being converted to the schema of the first one:
+        pd.read_csv infers dtypes chunk by chunk, so an int column missing
+        values in a later chunk only is read as float there. A column with
+        no value in the first chunk has no type to infer from it; pass its
+        type with a pyarrow schema= then. Any other file is written as CSV
+        with the header of the first chunk.
+
+        Parameters
+        --------
+        chunks: iterable of pandas.core.frame.DataFrame
+            the chunks to scale, e.g. from pd.read_csv(chunksize=)
+        path: str
+            the file to write
+        **kwargs:
+            passed on to DataFrame.to_csv or pyarrow.parquet.ParquetWriter
+
+        Returns
+        --------
+        int
+            the number of rows written
+
+        Examples
+        --------
+        >>>sc.transform_to_file(pd.read_csv("score.csv", chunksize=10**5),
+        ...                     "score_scaled.csv", index=False)
+        """
+        scaled = self.transform_stream(chunks)
+        n_rows = 0
+        if str(path).endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = kwargs.pop("schema", None)
+            writer = None
+            try:
+                for chunk in scaled:
+                    try:
+                        table = pa.Table.from_pandas(
+                            chunk, schema=schema, preserve_index=False
+                        )
+                    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                        raise ValueError(
+                            f"Rows {n_rows} onwards do not match the parquet "
+                            f"schema, pass schema= to set it: {e}"
+                        ) from e
+                    if writer is None:
+                        schema = table.schema
+                        writer = pq.ParquetWriter(path, schema, **kwargs)
+                    writer.write_table(table)
+                    n_rows += len(chunk)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return n_rows
+        with open(path, "w", newline="") as f:
+            for i, chunk in enumerate(scaled):
+                chunk.to_csv(f, header=i == 0, **kwargs)
+                n_rows += len(chunk)
+        return n_rows
+
+    def save(self, path):
+        """
+        Saves the fitted scaler to a file
+
+        The file has the same layout as imputation.save: a one line JSON
+        header followed by the raw feature names, centers and scales.
+
+        Parameters
+        --------
+        path: str
+            the file to write
+        """
+        if self._operands is None:
+            raise ValueError("The scaler must be fitted before saving")
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "scaler_type": self.scaler_type,
+            "coerce": self.coerce,
+            "engine": self.engine,
+            "dtype": self.dtype.str,
+            "n_quantiles": self.n_quantiles,
+            "sketch_size": self.sketch_size,
+            "n_samples_seen": self.n_samples_seen_,
+        }
+        arrays = pack("features", self.features)
+        if self.scaler_type == "QuantileTransformer":
+            arrays["quantiles"] = self.quantiles_
+        else:
+            arrays["center"] = self.center_
+            arrays["scale"] = self.scale_
+        if isinstance(self._state, Moments):
+            # the running moments let a loaded scaler keep partial fitting
+            for name, stat in self._state.to_dict().items():
+                arrays["moments_" + name] = stat
+        write_arrays(path, meta, arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a scaler saved with save
+
+        Parameters
+        --------
+        path: str
+            the file to read
+
+        Returns
+        --------
+        Scaler
+            the fitted scaler
+        """
+        meta, arrays = read_arrays(path)
+        if meta["format_version"] > FORMAT_VERSION:
+            raise ValueError("File was saved by a newer prepropy")
+        # files saved before these options were saved get their defaults
+        sc = cls(
+            meta["scaler_type"],
+            coerce=meta.get("coerce", False),
+            engine=meta["engine"],
+            dtype=meta["dtype"],
+            n_quantiles=meta.get("n_quantiles", 1000),
+            sketch_size=meta.get("sketch_size", 1000),
+        )
+        sc.features = unpack(arrays, "features").tolist()
+        sc.n_samples_seen_ = meta["n_samples_seen"]
+        if sc.scaler_type == "QuantileTransformer":
+            sc._set_quantiles(arrays["quantiles"])
+        else:
+            sc._set_stats(arrays["center"], arrays["scale"])
+        if "moments_count" in arrays:
+            sc._state = Moments.from_dict(
+                {
+                    name[len("moments_"):]: stat
+                    for name, stat in arrays.items()
+                    if name.startswith("moments_")
+                }
+            )
+        return sc
+
+    def _set_stats(self, center, scale):
+        """
+        Stores the center and scale and precomputes the transform operands
+        in the output dtype
+        """
+        self.center_ = np.asarray(center, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        # scikit-learn applies MinMaxScaler as x * (1 / scale) + offset
+        mul = 1.0 / self.scale_
+        self._operands = {
+            "center": self.center_.astype(self.dtype),
+            "scale": self.scale_.astype(self.dtype),
+            "mul": mul.astype(self.dtype),
+            "offset": (0.0 - self.center_ * mul).astype(self.dtype),
+        }
+
+    def _set_quantiles(self, quantiles):
+        """
+        Stores the quantile table of a QuantileTransformer
+        """
+        self.quantiles_ = np.asarray(quantiles, dtype=np.float64)
+        self._operands = {
+            "quantiles": self.quantiles_,
+            "references": np.linspace(0, 1, len(self.quantiles_)),
+        }
+
+    def _apply(self, arr):
+        """
+        Scales a 2-D float array in place, one column per feature
+        """
+        ops = self._operands
+        if self.scaler_type == "QuantileTransformer":
+            refs = ops["references"]
+            for i in range(arr.shape[1]):
+                x, quantiles = arr[:, i], ops["quantiles"][:, i]
+                # like scikit-learn, interpolating upwards and downwards
+                # and averaging maps repeated quantiles to their middle,
+                # and values at the bounds go to 0 and 1
+                out = 0.5 * (
+                    np.interp(x, quantiles, refs)
+                    - np.interp(-x, -quantiles[::-1], -refs[::-1])
+                )
+                out[x == quantiles[-1]] = 1.0
+                out[x == quantiles[0]] = 0.0
+                x[:] = out
+        elif self.scaler_type == "MinMaxScaler":
+            np.multiply(arr, ops["mul"], out=arr)
+            np.add(arr, ops["offset"], out=arr)
+        else:
+            if self.scaler_type != "MaxAbsScaler":
+                np.subtract(arr, ops["center"], out=arr)
+            np.divide(arr, ops["scale"], out=arr)
+        return arr
+
+
+def _feature_array(X, features, coerce=False, dtype=np.float64):
+    """
+    Returns the features of a dataframe as a new 2-D float array
+
+    Each feature is validated and converted in a single pass straight into
+    its column of the array, a plain copy for numeric dtypes. The array is
+    column major like the pandas blocks, so the column reductions and the
+    rebuilt dataframe read contiguous memory. Strings are accepted if
+    float() accepts them (negative numbers, decimals, exponents) and None
+    is read as nan.
+
+    Parameters
+    --------
+    X : pandas.core.frame.DataFrame
+        The data
+    features: list of strings
+        The features to extract
+    coerce: bool
+        Whether values that are not numbers become nan (via pd.to_numeric)
+        instead of raising a ValueError
+    dtype: numpy dtype
+        The float type of the array. Default np.float64
+
+    Returns
+    --------
+    numpy array
+        a float array with one column per feature
+    """
+    arr = np.empty((len(X), len(features)), dtype=dtype, order="F")
+    for i, feature in enumerate(features):
+        column = X[feature]
+        if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf":
+            arr[:, i] = column.to_numpy()
+            continue
+        try:
+            arr[:, i] = column.to_numpy(dtype=dtype, na_value=np.nan)
+        except (TypeError, ValueError):
+            if not coerce:
+                raise ValueError("Features should have only numeric values")
+            column = pd.to_numeric(column, errors="coerce")
+            arr[:, i] = column.to_numpy(dtype=dtype, na_value=np.nan)
+    return arr
+
+
+def _with_columns(X, features, arr, copy=True):
+    """
+    Returns a new dataframe with the features of X replaced by the columns
+    of arr
+
+    The frame is built once from its columns; assigning the features one by
+    one would split and copy the numeric block of X for every feature. With
+    copy=False the other columns are shared with X instead of copied.
+    """
+    if not X.columns.is_unique:
+        X_new = X.copy(deep=copy)
+        X_new[features] = arr
+        return X_new
+    position = {feature: i for i, feature in enumerate(features)}
+    if copy:
+        data = {
+            column: arr[:, position[column]]
+            if column in position
+            else X[column]
+            for column in X.columns
+        }
+        X_new = pd.DataFrame(data, index=X.index)
+        X_new.columns = X.columns
+        return X_new
+    # concatenating the columns keeps each of them as its own block
+    X_new = pd.concat(
+        [
+            pd.Series(arr[:, position[column]], index=X.index, name=column)
+            if column in position
+            else X[column]
+            for column in X.columns
+        ],
+        axis=1,
+        copy=False,
+    )
+    X_new.columns = X.columns
+    return X_new
+
+
+def _assign_columns(X, features, arr):
+    """
+    Writes the columns of arr into the features of X in place
+
+    Features already stored with the dtype of arr are overwritten in their
+    block, the others are replaced by the new column.
+    """
+    for i, feature in enumerate(features):
+        column = X[feature].to_numpy()
+        if column.dtype == arr.dtype and column.flags.writeable:
+            column[:] = arr[:, i]
+        else:
+            X[feature] = arr[:, i]
+
+
+def _list_partitions(partitions):
+    """
+    Returns the partitions as a list, expanding a directory to its files
+    """
+    if isinstance(partitions, (str, os.PathLike)):
+        if not os.path.isdir(partitions):
+            return [partitions]
+        return [
+            os.path.join(partitions, name)
+            for name in sorted(os.listdir(partitions))
+            if not name.startswith((".", "_"))
+        ]
+    return list(partitions)
+
+
+def _fit_partition(
+    partition, scaler_type, coerce, n_quantiles, sketch_size, features
+):
+    """
+    Reads a partition if it is a path and returns its moments or sketches
+    """
+    if isinstance(partition, (str, os.PathLike)):
+        if str(partition).endswith(".parquet"):
+            partition = pd.read_parquet(partition, columns=features)
+        else:
+            partition = pd.read_csv(partition, usecols=features)
+    sc = Scaler(
+        scaler_type,
+        coerce,
+        n_quantiles=n_quantiles,
+        sketch_size=sketch_size,
+    )
+    return sc.fit(partition, features)._state
+
+
+def _sketch_quantiles(n_quantiles, sketches):
+    """
+    Returns the quantile table of a QuantileTransformer from its sketches
+    """
+    n_quantiles = max(min(n_quantiles, int(np.max(sketches.count))), 2)
+    quantiles = sketches.quantile(np.linspace(0, 1, n_quantiles))
+    # estimated quantiles must not decrease for the interpolation
+    return np.maximum.accumulate(quantiles, axis=0)
+
+
+def _moments_stats(scaler_type, moments):
+    """
+    Returns the center and scale of a scaler type from running moments
+    """
+    count = moments.count
+    # features without any value get nan statistics, as in scikit-learn
+    data_min = np.where(count > 0, moments.min, np.nan)
+    data_max = np.where(count > 0, moments.max, np.nan)
+    if scaler_type == "StandardScaler":
+        var = moments.var()
+        mean = moments.mean
+        # scikit-learn's _is_constant_feature
+        eps = np.finfo(np.float64).eps
+        constant = var <= count * eps * var + (count * mean * eps) ** 2
+        scale = np.sqrt(var)
+        scale[constant] = 1.0
+        return mean, scale
+    if scaler_type == "MinMaxScaler":
+        return data_min, _handle_zeros(data_max - data_min)
+    max_abs = np.maximum(np.abs(data_min), np.abs(data_max))
+    return np.zeros_like(max_abs), _handle_zeros(max_abs)
+
+
+def _handle_zeros(scale):
+    """
+    Replaces scales too close to zero by one, like scikit-learn does
+    """
+    scale = np.array(scale, dtype=np.float64)
+    scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+    return scale
 
 
 def scaler(
-    X_train, X_Valid, X_test, scale_features, scaler_type="StandardScaler"
+    X_train,
+    X_Valid,
+    X_test,
+    scale_features,
+    scaler_type="StandardScaler",
+    coerce=False,
+    copy=True,
+    inplace=False,
 ):
     """
     This function scales numerical features based on scaling requirement
 
+    The scaler is fitted on X_train only; use Scaler directly to keep the
+    fitted statistics for more data.
+
     Parameters
     --------
     X_train : pandas.core.frame.DataFrame, numpy array or list
@@ -22,6 +831,14 @@ def scaler(
         The list of numerical features to be scaled
     scaler_type: string
         The type of scaling to perform on the numerical columns.
+    coerce: bool
+        Whether non numeric values in the features become nan instead of
+        raising a ValueError. Default False
+    copy: bool
+        Whether the columns that are not scaled are copied. With False the
+        returned dataframes share them with the inputs. Default True
+    inplace: bool
+        Whether the three dataframes are scaled in place. Default False
 
     Returns
     --------
@@ -34,9 +851,9 @@ def scaler(
     """
 
     # Error Checking
-    if scaler_type not in ["StandardScaler", "MinMaxScaler", "MaxAbsScaler"]:
+    if scaler_type not in SCALERS:
         raise KeyError(
-            'Please use scaler "StandardScaler", "MinMaxScaler", "MaxAbsScaler"'  # noqa: E501
+            'Please use scaler "StandardScaler", "MinMaxScaler", "MaxAbsScaler", "RobustScaler", "QuantileTransformer"'  # noqa: E501
         )
     if (
         not isinstance(X_train, pd.DataFrame)
@@ -51,45 +868,20 @@ def scaler(
         or (len(scale_features) == 0)
     ):
         raise ValueError("Inputs cannot be empty")
-    for feature in scale_features:
-        if (X_train[feature].str.isnumeric().sum()) != len(X_train[feature]):
-            raise ValueError("Features should have only numeric values")
-        if (X_Valid[feature].str.isnumeric().sum()) != len(X_Valid[feature]):
-            raise ValueError("Features should have only numeric values")
-        if (X_test[feature].str.isnumeric().sum()) != len(X_test[feature]):
-            raise ValueError("Features should have only numeric values")
-
-    # Scaling Instance
-    scaled_data = {}
-    if scaler_type == "StandardScaler":
-        scaler_instance = StandardScaler()
-    elif scaler_type == "MinMaxScaler":
-        scaler_instance = MinMaxScaler()
-    elif scaler_type == "MaxAbsScaler":
-        scaler_instance = MaxAbsScaler()
-
-    # Fitting the data for Scaling
-    scaler_instance.fit(X_train[scale_features])
-
-    # Scaling train data
-    X_train_scaled = X_train.copy()
-    X_train_scaled[scale_features] = scaler_instance.transform(
-        X_train[scale_features]
-    )
-    scaled_data["X_train"] = X_train_scaled
 
-    # Scaling the validation data
-    X_Valid_scaled = X_Valid.copy()
-    X_Valid_scaled[scale_features] = scaler_instance.transform(
-        X_Valid[scale_features]
+    # Fitting the data for Scaling, the features of each dataframe are
+    # validated while they are converted to floats
+    scaler_instance = Scaler(scaler_type, coerce).fit(
+        X_train, scale_features
     )
-    scaled_data["X_Valid"] = X_Valid_scaled
 
-    # Scaling the test data
-    X_test_scaled = X_test.copy()
-    X_test_scaled[scale_features] = scaler_instance.transform(
-        X_test[scale_features]
-    )
-    scaled_data["X_test"] = X_test_scaled
+    # Scaling train, validation and test data
+    scaled_data = {}
+    for name, X in [
+        ("X_train", X_train),
+        ("X_Valid", X_Valid),
+        ("X_test", X_test),
+    ]:
+        scaled_data[name] = scaler_instance.transform(X, copy, inplace)
 
     return scaled_data
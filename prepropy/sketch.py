@@ -0,0 +1,353 @@
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """
+    A bounded-memory, mergeable quantile sketch for streaming numeric data
+
+    The sketch is a stack of KLL-style compactors. Level h holds items that
+    each stand for 2**h observations; when a level outgrows its capacity it
+    is sorted and every other item is promoted to the next level. Capacities
+    shrink geometrically towards the lower levels, so at most about 3 * k
+    items are retained however many values are added.
+
+    Until more than k values have been added nothing is compacted and the
+    quantiles are exact. After that the rank of a returned quantile is off
+    by at most about 2 / k of the number of values with high probability,
+    i.e. roughly 1% of n for the default k = 200.
+
+    Parameters
+    --------
+    k: int
+        the capacity of the top compactor, trading memory for accuracy.
+        Default 200
+    seed: int
+        seed for the random compaction offsets. Default None
+
+    Examples
+    --------
+    >>>sketch = QuantileSketch()
+    >>>sketch.update(np.random.randn(1_000_000))
+    >>>sketch.quantile(0.5)
+    """
+
+    def __init__(self, k=200, seed=None):
+        if k < 2:
+            raise ValueError("k must be at least 2")
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """
+        Adds the non-missing entries of values to the sketch
+
+        Parameters
+        --------
+        values: numpy array
+            a one dimensional array of numbers
+
+        Returns
+        --------
+        The sketch itself
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.count += values.size
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Merges another sketch into this one
+
+        Parameters
+        --------
+        other: QuantileSketch
+            a sketch built over another part of the data
+
+        Returns
+        --------
+        The sketch itself
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Estimates the q-th quantile of the values added so far
+
+        Parameters
+        --------
+        q: float or array-like of float
+            quantile(s) to compute, between 0 and 1
+
+        Returns
+        --------
+        float or numpy array, nan if the sketch is empty
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)[()]
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(lvl.size, 2.0 ** h) for h, lvl in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items = items[order]
+        ranks = np.cumsum(weights[order])
+        pos = np.searchsorted(ranks, np.asarray(q) * ranks[-1], side="left")
+        return items[np.minimum(pos, items.size - 1)]
+
+    def _capacity(self, h):
+        """
+        Capacity of level h, shrinking by 2/3 per level below the top
+        """
+        depth = len(self.levels) - h - 1
+        return max(int(np.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def _compress(self):
+        """
+        Compacts every level that holds more items than its capacity
+        """
+        h = 0
+        while h < len(self.levels):
+            if self.levels[h].size > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[h])
+                odd = items.size % 2
+                promoted = items[odd:][self._rng.integers(2)::2]
+                self.levels[h] = items[:odd]
+                self.levels[h + 1] = np.concatenate(
+                    [self.levels[h + 1], promoted]
+                )
+            h += 1
+
+
+class HyperLogLog:
+    """
+    A bounded-memory, mergeable distinct count for streaming values
+
+    Every value is hashed to 64 bits; the first p bits pick one of 2**p
+    registers, which keeps the longest run of leading zeros seen in the
+    remaining bits. The harmonic mean of the registers estimates the number
+    of distinct values, with linear counting over the empty registers for
+    small counts. Duplicates leave the registers unchanged, so the memory
+    is 2**p bytes whatever the number of values.
+
+    The relative standard error is 1.04 / sqrt(2**p), about 0.8% for the
+    default p = 14 (16 KB). Counts up to a few hundred are close to exact.
+
+    Parameters
+    --------
+    p: int
+        the number of index bits, between 4 and 18. Default 14
+
+    Examples
+    --------
+    >>>hll = HyperLogLog()
+    >>>hll.update(df["user_id"])
+    >>>hll.count()
+    """
+
+    def __init__(self, p=14):
+        if not 4 <= p <= 18:
+            raise ValueError("p must be between 4 and 18")
+        self.p = p
+        self.registers = np.zeros(2 ** p, dtype=np.uint8)
+
+    def update(self, values):
+        """
+        Adds the non-missing entries of values to the sketch
+
+        Parameters
+        --------
+        values: array-like
+            a one dimensional array, Series or Index of any dtype; numbers
+            are hashed as floats so 1 and 1.0 count once
+
+        Returns
+        --------
+        The sketch itself
+        """
+        hashes = _hash_values(values)
+        if hashes.size:
+            bits = 64 - self.p
+            index = (hashes >> np.uint64(bits)).astype(np.intp)
+            rest = hashes & np.uint64((1 << bits) - 1)
+            # the remaining bits fit in a float exactly, so frexp gives
+            # their bit length
+            _, length = np.frexp(rest.astype(np.float64))
+            rank = (bits + 1 - length).astype(np.uint8)
+            np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """
+        Merges another sketch into this one
+
+        Parameters
+        --------
+        other: HyperLogLog
+            a sketch built over other values, with the same p
+
+        Returns
+        --------
+        The sketch itself
+        """
+        if other.p != self.p:
+            raise ValueError("Sketches have a different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """
+        Estimates the number of distinct values added so far
+
+        Returns
+        --------
+        int
+        """
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        powers = np.ldexp(1.0, -self.registers.astype(np.int64))
+        estimate = alpha * m * m / np.sum(powers)
+        empty = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and empty:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """
+    A bounded-memory, mergeable report of the most frequent values
+
+    The sketch keeps k counters. Each batch is counted exactly and merged
+    with the Space-Saving rule: a value missing from one side is counted
+    as the smallest count that side may have dropped, so every count is
+    an overestimate. With n values added, each reported count exceeds the
+    true count by at most its error, itself at most n / k, and every value
+    seen more than n / k times is reported. Missing values are counted as
+    a value of their own.
+
+    Parameters
+    --------
+    k: int
+        the number of counters. Default 100
+
+    Attributes
+    --------
+    counts: pandas.Series
+        the estimated count of each kept value, the most frequent first
+    errors: pandas.Series
+        the most each count may exceed the true count
+    floor: int
+        the largest count a value that is not kept may have
+    n: int
+        the number of values added
+
+    Examples
+    --------
+    >>>top = SpaceSaving(k=20)
+    >>>top.update(df["user_id"])
+    >>>top.counts.head()
+    """
+
+    def __init__(self, k=100):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self.counts = pd.Series([], dtype=np.int64)
+        self.errors = pd.Series([], dtype=np.int64)
+        self.floor = 0
+        self.n = 0
+
+    def update(self, values):
+        """
+        Adds values to the sketch
+
+        Parameters
+        --------
+        values: array-like
+            a one dimensional array or Series of any dtype
+
+        Returns
+        --------
+        The sketch itself
+        """
+        counts = pd.Series(values).value_counts(dropna=False)
+        return self.update_counts(counts)
+
+    def update_counts(self, counts):
+        """
+        Adds exact counts of values, e.g. from value_counts(dropna=False)
+
+        Parameters
+        --------
+        counts: pandas.Series
+            the number of times each value was seen, sorted descending
+
+        Returns
+        --------
+        The sketch itself
+        """
+        batch = SpaceSaving(self.k)
+        batch.n = int(counts.sum())
+        batch.counts = counts.iloc[: self.k].astype(np.int64)
+        batch.errors = pd.Series(0, index=batch.counts.index, dtype=np.int64)
+        if len(counts) > self.k:
+            batch.floor = int(counts.iloc[self.k])
+        return self.merge(batch)
+
+    def merge(self, other):
+        """
+        Merges another sketch into this one
+
+        Parameters
+        --------
+        other: SpaceSaving
+            a sketch built over other values
+
+        Returns
+        --------
+        The sketch itself
+        """
+        index = self.counts.index.union(other.counts.index, sort=False)
+        counts = self.counts.reindex(index, fill_value=self.floor).add(
+            other.counts.reindex(index, fill_value=other.floor)
+        )
+        errors = self.errors.reindex(index, fill_value=self.floor).add(
+            other.errors.reindex(index, fill_value=other.floor)
+        )
+        counts = counts.sort_values(ascending=False, kind="stable")
+        floor = self.floor + other.floor
+        if len(counts) > self.k:
+            floor = max(floor, int(counts.iloc[self.k]))
+            counts = counts.iloc[: self.k]
+        self.counts = counts.astype(np.int64)
+        self.errors = errors.reindex(counts.index).astype(np.int64)
+        self.floor = floor
+        self.n += other.n
+        return self
+
+
+def _hash_values(values):
+    """
+    Returns 64 bit hashes of the non-missing entries of values, numbers
+    being hashed as floats
+    """
+    values = pd.Series(np.asarray(values)).dropna()
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        values = values.astype(np.float64)
+    return pd.util.hash_array(values.to_numpy())
@@ -0,0 +1,453 @@
+import numpy as np
+
+from prepropy.sketch import QuantileSketch
+
+# the share of missing values up to which CrossProducts corrects the sums
+# of complete rows through a sparse mask rather than dense masked products
+SPARSE_MISSING = 0.05
+
+
+class Moments:
+    """
+    Mergeable per-column count, mean, variance, min, max and absolute max
+
+    Each batch is reduced with the same formulas as scikit-learn's
+    _incremental_mean_and_var (a nan-aware sum, then the squared deviations
+    with a correction term), and batches or accumulators built over other
+    partitions are combined with Chan's parallel formulas. Min and max are
+    combined exactly, so merging partitions gives the statistics of a single
+    pass to floating point tolerance.
+
+    Attributes
+    --------
+    count: numpy array
+        the number of non missing values of each column
+    mean: numpy array
+        the mean of each column, 0 for columns without values
+    m2: numpy array
+        the sum of squared deviations from the mean of each column
+    min: numpy array
+        the smallest value of each column, inf for columns without values
+    max: numpy array
+        the largest value of each column, -inf for columns without values
+
+    Examples
+    --------
+    >>>left = Moments().update(X[:1000])
+    >>>right = Moments().update(X[1000:])
+    >>>left.merge(right).var()
+    """
+
+    FIELDS = ["count", "mean", "m2", "min", "max"]
+
+    def __init__(self):
+        self.count = None
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+
+    def update(self, arr):
+        """
+        Adds a batch of rows to the statistics
+
+        Parameters
+        --------
+        arr: numpy array
+            a 2-D float array with one column per feature, nan for missing
+
+        Returns
+        --------
+        The accumulator itself
+        """
+        # without nan, np.sum gives the same pairwise sums as np.nansum, so
+        # the nan mask is only built when the plain sums show a nan
+        total = np.sum(arr, axis=0)
+        if np.isnan(total).any():
+            sum_ = np.nansum
+            total = sum_(arr, axis=0)
+            count = arr.shape[0] - np.count_nonzero(np.isnan(arr), axis=0)
+        else:
+            sum_ = np.sum
+            count = np.full(arr.shape[1], arr.shape[0])
+        count = count.astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            temp = arr - mean
+            correction = sum_(temp, axis=0)
+            np.square(temp, out=temp)
+            m2 = sum_(temp, axis=0) - correction ** 2 / count
+        batch = Moments.from_dict(
+            {
+                "count": count,
+                "mean": np.where(count > 0, mean, 0.0),
+                "m2": np.where(count > 0, m2, 0.0),
+                "min": np.fmin.reduce(arr, axis=0, initial=np.inf),
+                "max": np.fmax.reduce(arr, axis=0, initial=-np.inf),
+            }
+        )
+        return self.merge(batch)
+
+    def merge(self, other):
+        """
+        Merges the statistics of another accumulator into this one
+
+        Parameters
+        --------
+        other: Moments
+            an accumulator built over other rows of the same columns
+
+        Returns
+        --------
+        The accumulator itself
+        """
+        if other.count is None:
+            return self
+        if self.count is None:
+            for name in self.FIELDS:
+                setattr(self, name, np.array(getattr(other, name)))
+            return self
+        if len(self.count) != len(other.count):
+            raise ValueError("Moments have a different number of columns")
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = other.mean - self.mean
+            self.mean = self.mean + delta * np.where(n > 0, n_b / n, 0.0)
+            self.m2 = (
+                self.m2
+                + other.m2
+                + np.where(n > 0, delta ** 2 * n_a * n_b / n, 0.0)
+            )
+        self.count = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def var(self):
+        """
+        Returns the population variance of each column, nan without values
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.m2 / self.count
+
+    def absmax(self):
+        """
+        Returns the largest absolute value of each column
+        """
+        return np.maximum(np.abs(self.min), np.abs(self.max))
+
+    def to_dict(self):
+        """
+        Returns the statistics as a dict of arrays
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, arrays):
+        """
+        Builds an accumulator from the arrays returned by to_dict
+
+        Parameters
+        --------
+        arrays: dict
+            count, mean, m2, min and max arrays
+
+        Returns
+        --------
+        Moments
+        """
+        moments = cls()
+        for name in cls.FIELDS:
+            setattr(moments, name, np.array(arrays[name], dtype=np.float64))
+        return moments
+
+
+class ColumnQuantiles:
+    """
+    Mergeable per-column quantile sketches
+
+    Each column gets its own QuantileSketch, so quantiles of streaming or
+    partitioned data are estimated in bounded memory and without sorting
+    whole columns. The same seed is used for every column so refitting the
+    same data gives the same quantiles.
+
+    Parameters
+    --------
+    k: int
+        the capacity of the sketches, see QuantileSketch. Default 200
+    seed: int
+        seed for the random compaction offsets. Default 0
+
+    Examples
+    --------
+    >>>sketches = ColumnQuantiles().update(X[:1000]).update(X[1000:])
+    >>>sketches.quantile([0.25, 0.5, 0.75])
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.seed = seed
+        self.sketches = None
+
+    @property
+    def count(self):
+        """
+        The number of non missing values of each column
+        """
+        return np.array([sketch.count for sketch in self.sketches])
+
+    def update(self, arr):
+        """
+        Adds a batch of rows to the sketches
+
+        Parameters
+        --------
+        arr: numpy array
+            a 2-D float array with one column per feature, nan for missing
+
+        Returns
+        --------
+        The accumulator itself
+        """
+        if self.sketches is None:
+            self.sketches = [
+                QuantileSketch(self.k, self.seed) for _ in range(arr.shape[1])
+            ]
+        elif len(self.sketches) != arr.shape[1]:
+            raise ValueError("Batch has a different number of columns")
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(arr[:, i])
+        return self
+
+    def merge(self, other):
+        """
+        Merges the sketches of another accumulator into this one
+
+        Parameters
+        --------
+        other: ColumnQuantiles
+            an accumulator built over other rows of the same columns
+
+        Returns
+        --------
+        The accumulator itself
+        """
+        if other.sketches is None:
+            return self
+        if self.sketches is None:
+            self.sketches = [
+                QuantileSketch(self.k, self.seed) for _ in other.sketches
+            ]
+        if len(self.sketches) != len(other.sketches):
+            raise ValueError("Sketches have a different number of columns")
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def quantile(self, q):
+        """
+        Estimates quantiles of every column
+
+        Parameters
+        --------
+        q: float or array-like of float
+            quantile(s) to compute, between 0 and 1
+
+        Returns
+        --------
+        numpy array
+            one value per column for a single q, otherwise one row per q
+        """
+        return np.stack(
+            [sketch.quantile(q) for sketch in self.sketches], axis=-1
+        )
+
+
+class CrossProducts:
+    """
+    Mergeable pairwise counts, sums and cross-products of columns
+
+    For every pair of columns (i, j) the accumulator keeps, over the rows
+    where both are present, the number of rows, the sum and the sum of
+    squares of column i and the sum of products of the two columns. Each
+    batch adds a few matrix products (X^T X and, with missing values, the
+    same products with the missing mask, sparse when few values are
+    missing), which run in BLAS. The values
+    are shifted by the column means of the first batch, so the sums stay
+    small and the covariances do not lose precision to large means.
+    corr() then gives the pairwise complete Pearson correlations, the same
+    as pandas.DataFrame.corr().
+
+    Attributes
+    --------
+    shift: numpy array
+        the value subtracted from each column before accumulating
+    count: numpy array
+        the number of rows where both columns are present
+    sums: numpy array
+        sums[i, j] is the sum of column i over the rows where i and j are
+        present
+    squares: numpy array
+        squares[i, j] is the sum of squares of column i over the rows where
+        i and j are present
+    products: numpy array
+        the sum of products of each pair of columns
+
+    Examples
+    --------
+    >>>left = CrossProducts().update(X[:1000])
+    >>>right = CrossProducts().update(X[1000:])
+    >>>left.merge(right).corr()
+    """
+
+    FIELDS = ["shift", "count", "sums", "squares", "products"]
+
+    def __init__(self):
+        self.shift = None
+        self.count = None
+        self.sums = None
+        self.squares = None
+        self.products = None
+
+    def update(self, arr):
+        """
+        Adds a batch of rows to the cross-products
+
+        Parameters
+        --------
+        arr: numpy array
+            a 2-D float array with one column per feature, nan for missing
+
+        Returns
+        --------
+        The accumulator itself
+        """
+        n_features = arr.shape[1]
+        if self.shift is None:
+            with np.errstate(invalid="ignore"):
+                total = np.nansum(arr, axis=0)
+                count = arr.shape[0] - np.count_nonzero(np.isnan(arr), axis=0)
+                shift = np.where(count > 0, total / count, 0.0)
+            self.shift = shift
+            for name in self.FIELDS[1:]:
+                setattr(self, name, np.zeros((n_features, n_features)))
+        elif len(self.shift) != n_features:
+            raise ValueError("Batch has a different number of columns")
+        z = arr - self.shift
+        missing = np.isnan(z)
+        n_missing = np.count_nonzero(missing)
+        z[missing] = 0.0
+        squared = np.square(z)
+        if n_missing > SPARSE_MISSING * missing.size:
+            present = np.logical_not(missing).astype(np.float64)
+            self.count += present.T @ present
+            self.sums += z.T @ present
+            self.squares += squared.T @ present
+        else:
+            # the sums over every row minus the sums over the rows where
+            # the other column is missing, a product with the sparse mask
+            self.count += arr.shape[0]
+            self.sums += z.sum(axis=0)[:, None]
+            self.squares += squared.sum(axis=0)[:, None]
+            if n_missing:
+                # scipy always ships with scikit-learn
+                from scipy import sparse
+
+                mask = sparse.csc_matrix(missing, dtype=np.float64)
+                counts = np.asarray(mask.sum(axis=0)).ravel()
+                self.count += (mask.T @ mask).toarray()
+                self.count -= counts[:, None] + counts[None, :]
+                self.sums -= (mask.T @ z).T
+                self.squares -= (mask.T @ squared).T
+        self.products += z.T @ z
+        return self
+
+    def merge(self, other):
+        """
+        Merges the cross-products of another accumulator into this one
+
+        Parameters
+        --------
+        other: CrossProducts
+            an accumulator built over other rows of the same columns
+
+        Returns
+        --------
+        The accumulator itself
+        """
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            for name in self.FIELDS:
+                setattr(self, name, np.array(getattr(other, name)))
+            return self
+        if len(self.shift) != len(other.shift):
+            raise ValueError("Accumulators have a different number of columns")
+        # moves the sums of other to the shift of this accumulator
+        d = self.shift - other.shift
+        d_i, d_j = d[:, None], d[None, :]
+        self.count += other.count
+        self.sums += other.sums - d_i * other.count
+        self.squares += (
+            other.squares - 2 * d_i * other.sums + d_i ** 2 * other.count
+        )
+        self.products += (
+            other.products
+            - d_j * other.sums
+            - d_i * other.sums.T
+            + d_i * d_j * other.count
+        )
+        return self
+
+    def cov(self):
+        """
+        Returns the pairwise complete covariances, with one degree of freedom
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = (self.products - self.sums * self.sums.T / self.count) / (
+                self.count - 1
+            )
+        return np.where(self.count > 1, cov, np.nan)
+
+    def corr(self):
+        """
+        Returns the pairwise complete Pearson correlations, nan for pairs
+        with fewer than two rows or a constant column
+        """
+        count = self.count
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = self.products - self.sums * self.sums.T / count
+            var = self.squares - self.sums ** 2 / count
+            corr = cov / np.sqrt(var * var.T)
+        corr = np.where((count > 1) & (var > 0) & (var.T > 0), corr, np.nan)
+        np.clip(corr, -1.0, 1.0, out=corr)
+        diagonal = np.diagonal(corr).copy()
+        diagonal[np.isfinite(diagonal)] = 1.0
+        np.fill_diagonal(corr, diagonal)
+        return corr
+
+    def to_dict(self):
+        """
+        Returns the cross-products as a dict of arrays
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, arrays):
+        """
+        Builds an accumulator from the arrays returned by to_dict
+
+        Parameters
+        --------
+        arrays: dict
+            shift, count, sums, squares and products arrays
+
+        Returns
+        --------
+        CrossProducts
+        """
+        cross = cls()
+        for name in cls.FIELDS:
+            setattr(cross, name, np.array(arrays[name], dtype=np.float64))
+        return cross
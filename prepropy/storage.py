@@ -0,0 +1,139 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+
+_KINDS = {"b": bool, "i": int, "f": float, "s": str}
+
+
+def write_arrays(path, meta, arrays):
+    """
+    Writes metadata and named arrays as a one line JSON header followed by
+    the raw array buffers
+
+    The header maps each array name to its dtype, shape and byte offset
+    after the header line, so the buffers can be read (or memory mapped)
+    in place.
+
+    Parameters
+    --------
+    path: str
+        the file to write
+    meta: dict
+        JSON serializable metadata
+    arrays: dict
+        numpy arrays by name, of any dtype but object
+    """
+    layout, offset = {}, 0
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    for name, arr in arrays.items():
+        layout[name] = [arr.dtype.str, list(arr.shape), offset]
+        offset += arr.nbytes
+    header = dict(meta, arrays=layout)
+    with open(path, "wb") as f:
+        f.write(json.dumps(header).encode() + b"\n")
+        for arr in arrays.values():
+            f.write(arr.tobytes())
+
+
+def read_arrays(path):
+    """
+    Reads back the metadata and named arrays written by write_arrays
+
+    Parameters
+    --------
+    path: str
+        the file to read
+
+    Returns
+    --------
+    tuple
+        the metadata dict and a dict of arrays by name
+    """
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    start = data.index(b"\n") + 1
+    meta = json.loads(data[:start])
+    arrays = {}
+    for name, (dtype, shape, offset) in meta.pop("arrays").items():
+        arrays[name] = np.frombuffer(
+            data,
+            dtype=np.dtype(dtype),
+            count=int(np.prod(shape, dtype=np.int64)),
+            offset=start + offset,
+        ).reshape(shape)
+    return meta, arrays
+
+
+def pack(name, items):
+    """
+    Converts values for saving, encoding object arrays as strings
+
+    Items of mixed types (e.g. strings and numbers) become a unicode array
+    named name + "_str" plus a kind code per item in name + "_kind", so that
+    loading them never needs pickle.
+
+    Parameters
+    --------
+    name: str
+        the name to save the values under
+    items: list or numpy array
+        the values
+
+    Returns
+    --------
+    dict
+        the arrays to pass to write_arrays
+    """
+    items = pd.Index(items).to_numpy() if isinstance(items, list) else items
+    if items.dtype != object:
+        return {name: items}
+    kinds = []
+    for item in items:
+        if item is None or item != item:
+            kinds.append("n")
+            continue
+        if isinstance(item, np.generic):
+            item = item.item()
+        for kind, base in _KINDS.items():
+            if isinstance(item, base):
+                kinds.append(kind)
+                break
+        else:
+            raise TypeError(f"Cannot save values of type {type(item)}")
+    if set(kinds) == {"s"}:
+        return {name: items.astype(str)}
+    return {name + "_str": items.astype(str), name + "_kind": np.array(kinds)}
+
+
+def unpack(arrays, name):
+    """
+    Reads back values converted by pack
+
+    Parameters
+    --------
+    arrays: dict
+        the arrays returned by read_arrays
+    name: str
+        the name the values were saved under
+
+    Returns
+    --------
+    numpy array
+    """
+    if name in arrays:
+        items = arrays[name]
+        return items.astype(object) if items.dtype.kind == "U" else items
+    strs = arrays[name + "_str"]
+    kinds = arrays[name + "_kind"]
+    items = strs.astype(object)
+    for kind, base in _KINDS.items():
+        mask = kinds == kind
+        if kind == "b":
+            items[mask] = strs[mask] == "True"
+        elif mask.any():
+            items[mask] = strs[mask].astype(base).astype(object)
+    items[kinds == "n"] = np.nan
+    return items
@@ -0,0 +1,83 @@
+from prepropy.cache import ResultCache, fingerprint
+from prepropy import eda
+import pytest
+import pandas as pd
+import numpy as np
+
+
+def gen_test_data():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "num": rng.normal(size=100),
+            "int": rng.integers(0, 5, size=100),
+            "cat": rng.choice(["a", "b", None], size=100),
+            "target": rng.integers(0, 2, size=100),
+        }
+    )
+    return df
+
+
+def test_fingerprint():
+    """Tests that any change to the data or arguments changes the key"""
+    df = gen_test_data()
+    key = fingerprint(df, "target")
+    assert fingerprint(df.copy(), "target") == key
+    assert fingerprint(df, "int") != key
+    changed = df.copy()
+    changed.loc[3, "num"] += 1e-12
+    assert fingerprint(changed, "target") != key
+    changed = df.copy()
+    changed.loc[3, "cat"] = "c"
+    assert fingerprint(changed, "target") != key
+    assert fingerprint(df.astype({"int": float}), "target") != key
+    assert fingerprint(df.rename(columns={"num": "x"}), "target") != key
+    assert fingerprint(df.set_index(df.index + 1), "target") != key
+    assert fingerprint(df.iloc[:-1], "target") != key
+
+
+def test_lru(tmp_path):
+    """Tests the eviction of the least recently used results and the disk"""
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+    disk = ResultCache(maxsize=1, path=tmp_path)
+    disk.put("a", {"x": 1})
+    disk.put("b", {"x": 2})
+    assert len(disk) == 1
+    assert disk.get("a") == {"x": 1}
+    assert ResultCache(path=tmp_path).get("b") == {"x": 2}
+    disk.clear()
+    assert ResultCache(path=tmp_path).get("b") is None
+    with pytest.raises(ValueError):
+        ResultCache(maxsize=0)
+
+
+def test_eda_cache(tmp_path):
+    """Tests that eda reuses cached results until the data changes"""
+    df = gen_test_data()
+    cache = ResultCache(path=tmp_path)
+    first = eda.eda(df, "target", cache=cache)
+    second = eda.eda(df, "target", cache=cache)
+    assert cache.hits == 1
+    assert second["summary"].equals(first["summary"])
+    second["extra"] = 1
+    second["summary"].loc["num", "max"] = -1.0
+    second["num_features_name"].append("extra")
+    third = eda.eda(df, "target", cache=cache)
+    assert "extra" not in third
+    assert third["summary"].equals(first["summary"])
+    assert third["num_features_name"] == first["num_features_name"]
+    eda.eda(df, "target", cor=None, cache=cache)
+    df.loc[0, "num"] = 10.0
+    changed = eda.eda(df, "target", cache=cache)
+    assert cache.misses == 3
+    assert changed["summary"].loc["num", "max"] == 10.0
+    persisted = eda.eda(df, "target", cache=ResultCache(path=tmp_path))
+    assert persisted["summary"].equals(changed["summary"])
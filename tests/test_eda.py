@@ -79,3 +79,203 @@ def test_eda_raise_error_not_dataframe():
     message = "Input data must be an instance of DataFrame"
     with pytest.raises(TypeError, match=message):
         eda.eda(test_input, "target")
+
+
+# test for the single pass summary and column order
+def test_summary():
+    test_data = gen_test_data()
+    test_data.loc[1, "num3"] = None
+    eda_res = eda.eda(test_data, "target")
+    summary = eda_res["summary"]
+    assert eda_res["num_features_name"] == ["num1", "num2", "num3", "num4"]
+    assert eda_res["nb_missing_values"][2] == ("num3", 1)
+    assert summary.loc["num3", "count"] == 4
+    expected = test_data[["num1", "num2", "num3", "num4"]].describe()
+    for stat in ["mean", "std", "min", "max"]:
+        assert summary.loc["num1":"num4", stat].tolist() == pytest.approx(
+            expected.loc[stat].tolist()
+        )
+    assert eda_res["class_ratio"] == [0.4, 0.4, 0.2]
+
+
+# test for the sampled scatter pairplot
+def test_pairplot_max_rows():
+    test_data = pd.DataFrame({"num1": range(1000), "num2": range(1000)})
+    test_data["target"] = ["a"] * 800 + ["b"] * 150 + [None] * 50
+    eda_res = eda.eda(test_data, "target", max_rows=100)
+    values = list(eda_res["pairplot"].to_dict()["datasets"].values())[0]
+    sample = pd.DataFrame(values)
+    assert len(sample) == 100
+    assert sample["target"].value_counts(dropna=False).tolist() == [80, 15, 5]
+    assert sample["num1"].is_monotonic_increasing
+    eda_res = eda.eda(test_data, "target", max_rows=None)
+    values = list(eda_res["pairplot"].to_dict()["datasets"].values())[0]
+    assert len(values) == 1000
+
+
+# test for the binned pairplot
+def test_pairplot_binned():
+    test_data = gen_test_data()
+    test_data.loc[0, "num2"] = None
+    eda_res = eda.eda(test_data, "target", pairplot="binned", bins=4)
+    p = eda_res["pairplot"]
+    assert isinstance(p, alt.vegalite.v4.api.FacetChart)
+    values = list(p.to_dict()["datasets"].values())[0]
+    counts = pd.DataFrame(values)
+    totals = counts.groupby(["x_feature", "y_feature"])["count"].sum()
+    assert totals[("num1", "num1")] == 5
+    assert totals[("num1", "num2")] == 4
+    assert totals[("num2", "num1")] == 4
+    assert len(counts) <= 16 * 4 * 4
+    with pytest.raises(KeyError):
+        eda.eda(test_data, "target", pairplot="hexbin")
+
+
+# test for eda over a file read in chunks
+def test_eda_stream(tmp_path):
+    test_data = pd.DataFrame({"num1": range(1000), "num2": range(1000)})
+    test_data["num2"] = test_data["num2"] % 7 * 0.5
+    test_data.loc[::9, "num1"] = None
+    test_data["cat1"] = ["x", "y"] * 500
+    test_data["target"] = ["a"] * 800 + ["b"] * 150 + [None] * 50
+    path = tmp_path / "data.csv"
+    test_data.to_csv(path, index=False)
+    expected = eda.eda(test_data, "target", max_rows=100)
+    eda_res = eda.eda_stream(path, "target", chunksize=128, max_rows=100)
+    for key in ["nb_missing_values", "num_features_name", "nb_class"]:
+        assert eda_res[key] == expected[key]
+    assert eda_res["class_ratio"] == expected["class_ratio"]
+    pd.testing.assert_frame_equal(
+        eda_res["summary"].drop(columns="dtype"),
+        expected["summary"].drop(columns="dtype"),
+    )
+    values = list(eda_res["pairplot"].to_dict()["datasets"].values())[0]
+    sample = pd.DataFrame(values)
+    assert sample["target"].value_counts(dropna=False).tolist() == [80, 15, 5]
+    assert sample["num1"].dropna().is_monotonic_increasing
+    chunks = pd.read_csv(path, chunksize=300)
+    eda_res = eda.eda_stream(chunks, "target", max_rows=None)
+    values = list(eda_res["pairplot"].to_dict()["datasets"].values())[0]
+    assert len(values) == 1000
+    binned = eda.eda_stream(path, "target", chunksize=128, pairplot="binned")
+    expected = eda.eda(test_data, "target", pairplot="binned")
+    values = list(binned["pairplot"].to_dict()["datasets"].values())[0]
+    expected = list(expected["pairplot"].to_dict()["datasets"].values())[0]
+    assert pd.DataFrame(values).equals(pd.DataFrame(expected))
+    with pytest.raises(ValueError):
+        eda.eda_stream(iter([test_data]), "target", pairplot="binned")
+
+
+# test for eda over a parquet file read in batches
+def test_eda_stream_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    test_data = pd.DataFrame({"num1": range(1000), "num2": range(1000)})
+    test_data["num2"] = test_data["num2"] % 7 * 0.5
+    test_data["target"] = ["a"] * 800 + ["b"] * 200
+    path = tmp_path / "data.parquet"
+    test_data.to_parquet(path)
+    expected = eda.eda(test_data, "target", max_rows=100)
+    for pairplot in ["scatter", "binned"]:
+        eda_res = eda.eda_stream(
+            path, "target", chunksize=128, max_rows=100, pairplot=pairplot
+        )
+        assert eda_res["nb_class"] == expected["nb_class"]
+        assert eda_res["class_ratio"] == expected["class_ratio"]
+        pd.testing.assert_frame_equal(
+            eda_res["summary"].drop(columns="dtype"),
+            expected["summary"].drop(columns="dtype"),
+        )
+
+
+# test that the streamed sample stays bounded with a continuous target
+def test_eda_stream_many_classes():
+    test_data = pd.DataFrame({"num1": range(3000), "num2": range(3000)})
+    test_data["target"] = test_data["num1"] * 0.5
+    chunks = [test_data.iloc[i:i + 500] for i in range(0, 3000, 500)]
+    sample = eda._StratifiedSample(["num1", "target"], "target", 100)
+    for chunk in chunks:
+        sample.update(chunk)
+        assert len(sample._rows) <= 100
+    assert not sample.stratified
+    rows = sample.rows()
+    assert len(rows) == 100
+    assert rows["num1"].is_monotonic_increasing
+    eda_res = eda.eda_stream(iter(chunks), "target", max_rows=100)
+    values = list(eda_res["pairplot"].to_dict()["datasets"].values())[0]
+    assert len(values) == 100
+
+
+# test for the correlation report
+def test_correlation(tmp_path):
+    test_data = gen_test_data()
+    num_fea = ["num1", "num2", "num3", "num4"]
+    eda_res = eda.eda(test_data, "target")
+    expected = test_data[num_fea].corr()
+    pd.testing.assert_frame_equal(eda_res["cor"], expected)
+    eda_res = eda.eda(test_data, "target", cor="spearman")
+    expected = test_data[num_fea].corr("spearman")
+    pd.testing.assert_frame_equal(eda_res["cor"], expected)
+    assert eda.eda(test_data, "target", cor=None)["cor"] is None
+    test_data.loc[1, "num3"] = None
+    path = tmp_path / "data.csv"
+    test_data.to_csv(path, index=False)
+    eda_res = eda.eda_stream(path, "target", chunksize=2)
+    expected = test_data[num_fea].corr()
+    pd.testing.assert_frame_equal(eda_res["cor"], expected)
+    with pytest.raises(KeyError):
+        eda.eda(test_data, "target", cor="kendall")
+    with pytest.raises(ValueError):
+        eda.eda_stream(path, "target", cor="spearman")
+
+
+# test for the approximate counts
+def test_eda_approximate():
+    test_data = gen_test_data()
+    eda_res = eda.eda(test_data, "target", approximate=True)
+    expected = eda.eda(test_data, "target")
+    assert eda_res["nb_class"] == expected["nb_class"]
+    assert eda_res["class_ratio"] == expected["class_ratio"]
+    assert eda_res["summary"]["distinct"].tolist() == [5, 5, 5, 4, 4]
+    assert eda_res["top_values"]["cat1"]["Good"] == 2
+    assert "top_values" not in expected
+
+
+# test that the approximate class counts do not skew the pairplot sample
+def test_eda_approximate_pairplot():
+    test_data = pd.DataFrame({"num1": range(3000), "num2": range(3000)})
+    test_data["target"] = test_data["num1"] % 10
+    test_data.loc[test_data["num1"] < 1500, "target"] = 0
+    sample = eda._StratifiedSample(["num1", "target"], "target", 100)
+    for i in range(0, 3000, 700):
+        sample.update(test_data.iloc[i:i + 700])
+    counts = sample.rows()["target"].value_counts()
+    assert counts[0] == 55 and counts.drop(0).tolist() == [5] * 9
+    test_data["target"] = test_data["num1"] % 500
+    eda_res = eda.eda(test_data, "target", max_rows=1000, approximate=True)
+    values = list(eda_res["pairplot"].to_dict()["datasets"].values())[0]
+    assert pd.DataFrame(values)["target"].nunique() > 400
+
+
+# test for the lazy result
+def test_eda_lazy():
+    test_data = gen_test_data()
+    eda_res = eda.eda(test_data, "target")
+    assert isinstance(eda_res, eda.EDAResult)
+    assert "pairplot" in eda_res and "other" not in eda_res
+    assert eda_res["nb_num_features"] == 4
+    assert eda_res._profile is None
+    assert eda_res["nb_class"] == 3
+    assert eda_res._profile.cross is None
+    assert "pairplot" not in eda_res._values
+    num_fea = ["num1", "num2", "num3", "num4"]
+    pd.testing.assert_frame_equal(eda_res["cor"], test_data[num_fea].corr())
+    expected = dict(eda.eda(test_data, "target", cor=None))
+    assert list(dict(eda_res)) == list(expected)
+    assert eda_res["class_ratio"] == expected["class_ratio"]
+    eda_res["extra"] = 1
+    del eda_res["pairplot"]
+    assert list(eda_res)[-2:] == ["cor", "extra"]
+    with pytest.raises(KeyError):
+        eda_res["pairplot"]
+    with pytest.raises(KeyError):
+        eda.eda(test_data, "missing")
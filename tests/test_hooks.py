@@ -0,0 +1,89 @@
+from prepropy.hooks import add_hook, hooked, remove_hook, stage
+from prepropy.eda import eda
+from prepropy.imputation import imputation
+from prepropy.scaler import Scaler
+import pytest
+import pandas as pd
+import numpy as np
+
+
+def gen_test_data():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "num": rng.normal(size=100),
+            "int": rng.integers(0, 5, size=100).astype(float),
+            "target": rng.integers(0, 2, size=100),
+        }
+    )
+    df.loc[::7, "num"] = np.nan
+    return df
+
+
+def test_stage():
+    """Tests that stages are reported once done, and only with hooks"""
+    assert stage("test.idle", 1, 1) is stage("test.other", 2, 2)
+    with hooked() as events:
+        with stage("test.stage", 10, 3):
+            pass
+    assert len(events) == 1
+    event = events[0]
+    assert (event.stage, event.rows, event.columns) == ("test.stage", 10, 3)
+    assert event.elapsed_ns >= 0
+    assert event.bytes_allocated is None
+    with hooked(trace_memory=True) as events:
+        with stage("test.memory", 1, 1):
+            block = np.ones(2 ** 20)
+    assert events[0].bytes_allocated >= block.nbytes
+    with pytest.raises(ZeroDivisionError):
+        with hooked() as events:
+            with stage("test.error", 1, 1):
+                1 / 0
+    assert events == []
+
+
+def test_add_hook():
+    """Tests that callbacks receive events until they are removed"""
+    received = []
+    callback = add_hook(received.append)
+    try:
+        with stage("test.stage", 1, 1):
+            pass
+    finally:
+        remove_hook(callback)
+    with stage("test.stage", 1, 1):
+        pass
+    assert [event.stage for event in received] == ["test.stage"]
+    with pytest.raises(ValueError):
+        remove_hook(callback)
+
+
+def test_instrumented_stages():
+    """Tests the stages reported by eda, imputation and scaler"""
+    df = gen_test_data()
+    with hooked() as events:
+        eda(df, "target", cor="spearman")["pairplot"]
+    stages = [event.stage for event in events]
+    assert stages == ["eda.profile", "eda.sample", "eda.chart"]
+    assert events[0][1:3] == (100, 3)
+    with hooked() as events:
+        imputer = imputation("mean").fit(df)
+        imputer.fill(df)
+    stages = [event.stage for event in events]
+    assert stages == [
+        "imputation.validate",
+        "imputation.fit",
+        "imputation.copy",
+        "imputation.fill",
+    ]
+    with hooked() as events:
+        Scaler().fit(df, ["int"]).transform(df)
+    stages = [event.stage for event in events]
+    assert stages == [
+        "scaler.convert",
+        "scaler.fit",
+        "scaler.convert",
+        "scaler.apply",
+        "scaler.assemble",
+    ]
+    assert events[-1][1:3] == (100, 3)
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import pytest
+
+# milliseconds each module may take to import on top of numpy and pandas
+IMPORT_BUDGET_MS = 100
+
+MODULES = [
+    "prepropy",
+    "prepropy.cache",
+    "prepropy.eda",
+    "prepropy.hooks",
+    "prepropy.imputation",
+    "prepropy.pipeline",
+    "prepropy.profile",
+    "prepropy.scaler",
+    "prepropy.sketch",
+    "prepropy.stats",
+    "prepropy.storage",
+]
+
+# optional heavy dependencies, loaded only by the features that need them
+HEAVY_MODULES = ["altair", "sklearn", "scipy", "pyarrow"]
+
+
+def import_time(module):
+    """
+    Returns the microseconds python -X importtime reports for importing
+    module after numpy and pandas, and the modules it loaded
+    """
+    code = (
+        "import sys, numpy, pandas; before = set(sys.modules); "
+        f"import {module}; print(' '.join(set(sys.modules) - before))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    total = 0
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # top level entries are indented by a single space
+        if name.startswith(" prepropy"):
+            total += int(cumulative)
+    return total, out.stdout.split()
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import_time(module):
+    """Tests that each module imports within budget and stays lightweight"""
+    times = []
+    for _ in range(3):
+        total, loaded = import_time(module)
+        times.append(total)
+    heavy = {name.split(".")[0] for name in loaded} & set(HEAVY_MODULES)
+    assert not heavy, f"{module} imports {sorted(heavy)}"
+    assert min(times) / 1000 < IMPORT_BUDGET_MS
@@ -1,4 +1,4 @@
-from prepropy.imputation import imputation
+from prepropy.imputation import imputation, KNN_BRUTE_ROWS, KNN_TREES
 import pytest
 import pandas as pd
 import numpy as np
@@ -117,3 +117,335 @@ def test_length():
         imputer = imputation("most_frequent")
         imputer.fit(test_df1)
         imputer.fill(test_df2)
+
+
+def test_fill_inplace():
+    """Tests that copy=False fills the given dataframe itself"""
+    df = pd.DataFrame([[np.nan, 2, 3], [4, np.nan, 6], [10, 5, 9]])
+    imputer = imputation("mean")
+    imputer.fit(df)
+    filled = imputer.fill(df, copy=False)
+    assert filled is df, "Filled dataframe should be the input"
+    assert np.array_equal(
+        df.to_numpy(), np.array([[7.0, 2, 3], [4, 3.5, 6], [10, 5, 9]])
+    ), "Generated Output are incorrect"
+
+
+def test_fill_mixed_blocks():
+    """Tests filling a dataframe whose columns span several dtype blocks"""
+    df = pd.DataFrame({"a": [1.0, np.nan, 1.0], "b": ["x", None, "x"]})
+    df["c"] = [np.nan, 2.0, 2.0]
+    df["d"] = [1, 2, 3]
+    imputer = imputation("most_frequent")
+    imputer.fit(df)
+    original = df.copy()
+    filled = imputer.fill(df)
+    assert df.equals(original), "Input should not be modified"
+    assert filled["a"].tolist() == [1.0, 1.0, 1.0]
+    assert filled["b"].tolist() == ["x", "x", "x"]
+    assert filled["c"].tolist() == [2.0, 2.0, 2.0]
+    assert filled["d"].tolist() == [1, 2, 3]
+    assert filled.dtypes.equals(df.dtypes), "Dtypes should be preserved"
+    imputer.fill(df, copy=False)
+    assert df.equals(filled), "In place fill should match the copy"
+
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_fill_dtypes(copy):
+    """Tests that datetime, categorical, float32 and nullable columns keep
+    their dtype when filled"""
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2020-01-01", "2020-01-01", None]),
+            "cat": pd.Categorical(["a", "a", None]),
+            "f32": np.array([1.0, 1.0, np.nan], dtype=np.float32),
+            "int": pd.array([1, None, 1], dtype="Int64"),
+            "obj": ["x", None, "x"],
+        }
+    )
+    dtypes = df.dtypes
+    imputer = imputation("most_frequent").fit(df)
+    filled = imputer.fill(df, copy=copy)
+    assert filled.dtypes.equals(dtypes), "Dtypes should be preserved"
+    assert filled["date"].tolist() == [pd.Timestamp("2020-01-01")] * 3
+    assert filled["cat"].tolist() == ["a"] * 3
+    assert filled["f32"].tolist() == [1.0] * 3
+    assert filled["int"].tolist() == [1] * 3
+    assert filled["obj"].tolist() == ["x"] * 3
+
+
+def test_fit_stream():
+    """Tests that fitting on chunks matches fitting on the whole dataframe"""
+    df_num = pd.DataFrame(
+        [[np.nan, 2, 3], [4, np.nan, 6], [10, 5, 9], [3, 15, 17]]
+    )
+    df_obj = pd.DataFrame(
+        [[np.nan, 1, "c"], ["d", np.nan, "f"], ["d", 3, np.nan]]
+    )
+    for method, df in [
+        ("mean", df_num),
+        ("median", df_num),
+        ("most_frequent", df_obj),
+    ]:
+        full = imputation(method).fit(df)
+        chunks = [df.iloc[:2], df.iloc[2:]]
+        stream = imputation(method).fit_stream(iter(chunks))
+        assert np.array_equal(
+            full.values, stream.values
+        ), "Streamed values are incorrect"
+
+
+def test_partial_fit():
+    """Tests that partial_fit keeps the values up to date"""
+    imputer = imputation("mean")
+    imputer.partial_fit(pd.DataFrame([[1.0, np.nan], [3.0, 4.0]]))
+    assert np.array_equal(imputer.values, [2.0, 4.0])
+    imputer.partial_fit(pd.DataFrame([[5.0, 6.0]]))
+    assert np.array_equal(imputer.values, [3.0, 5.0])
+    with pytest.raises(TypeError):
+        imputer.partial_fit(pd.DataFrame([[1.0]]))
+    with pytest.raises(TypeError):
+        imputation("median").partial_fit(pd.DataFrame([["a"]]))
+
+
+@pytest.mark.parametrize("method", ["mean", "median"])
+def test_partial_fit_nullable(method):
+    """Tests that partial_fit treats pd.NA in nullable columns as missing"""
+    df = pd.DataFrame({"a": pd.array([1, None, 3], dtype="Int64")})
+    expected = imputation(method).fit(df).values
+    assert imputation(method).partial_fit(df).values.tolist() == [2.0]
+    assert expected.tolist() == [2.0]
+
+
+def test_fit_stream_empty():
+    """Tests whether fit_stream catches an empty stream"""
+    with pytest.raises(ValueError):
+        imputation("mean").fit_stream([])
+
+
+def test_fit_n_jobs():
+    """Tests that fitting in a process pool matches the serial fit"""
+    rng = np.random.default_rng(0)
+    arr = rng.integers(0, 5, size=(50, 7)).astype(float)
+    arr[arr == 0] = np.nan
+    df_num = pd.DataFrame(arr)
+    df_mix = pd.DataFrame(
+        [[np.nan, 1, "c", 1], ["d", np.nan, "f", 1], ["d", 3, np.nan, 2]]
+    )
+    df_nullable = df_num.astype("Int64")
+    for method, df in [
+        ("mean", df_num),
+        ("median", df_num),
+        ("most_frequent", df_num),
+        ("most_frequent", df_mix),
+        ("mean", df_nullable),
+        ("median", df_nullable),
+        ("most_frequent", df_nullable),
+    ]:
+        serial = imputation(method).fit(df)
+        parallel = imputation(method, n_jobs=2).fit(df)
+        assert list(serial.values) == list(
+            parallel.values
+        ), "Parallel values are incorrect"
+
+
+def test_fill_record():
+    """Tests filling single records of each supported type"""
+    imputer = imputation("mean")
+    imputer.fit(pd.DataFrame({"a": [1, 3], "b": [2, np.nan]}))
+    assert imputer.columns == ["a", "b"]
+    assert imputer.fill_record({"a": np.nan, "b": 5}) == {"a": 2.0, "b": 5}
+    assert imputer.fill_record({"b": None}) == {"a": 2.0, "b": 2.0}
+    assert imputer.fill_record((None, 1)) == (2.0, 1)
+    assert imputer.fill_record([np.nan, 1]) == [2.0, 1]
+    assert np.array_equal(
+        imputer.fill_record(np.array([np.nan, 1.0])), [2.0, 1.0]
+    )
+    with pytest.raises(TypeError):
+        imputer.fill_record((1, 2, 3))
+
+
+def test_fill_record_types():
+    """Tests complete integer records and pd.NA entries"""
+    imputer = imputation("mean")
+    imputer.fit(pd.DataFrame({"a": [1, 3], "b": [2, np.nan]}))
+    filled = imputer.fill_record(np.array([1, 2]))
+    assert filled.dtype == np.int64 and filled.tolist() == [1, 2]
+    assert imputer.fill_record({"a": pd.NA, "b": 5}) == {"a": 2.0, "b": 5}
+    assert imputer.fill_record((pd.NA, 1)) == (2.0, 1)
+    batch = np.array([[1, 2], [3, 4]])
+    assert imputer.fill_records(batch).tolist() == batch.tolist()
+    batch = np.array([[np.nan, 2]], dtype=np.float32)
+    filled = imputer.fill_records(batch)
+    assert filled.dtype == np.float32 and filled.tolist() == [[2.0, 2.0]]
+    knn = imputation("knn", n_neighbors=1)
+    knn.fit(pd.DataFrame({"a": [1.0, 3.0], "b": [2.0, 4.0]}))
+    assert knn.fill_record({"a": pd.NA, "b": 4.0}) == {"a": 3.0, "b": 4.0}
+
+
+def test_fill_records():
+    """Tests filling micro-batches of records"""
+    imputer = imputation("most_frequent")
+    imputer.fit(pd.DataFrame({"a": ["x", "x", "y"], "b": [1.0, 2.0, 2.0]}))
+    assert imputer.fill_records([{"a": None}, ("y", np.nan)]) == [
+        {"a": "x", "b": 2.0},
+        ("y", 2.0),
+    ]
+    batch = np.array([["y", np.nan], [None, 1.0]], dtype=object)
+    filled = imputer.fill_records(batch)
+    assert filled.tolist() == [["y", 2.0], ["x", 1.0]]
+    assert batch[1, 0] is None, "Input batch should not be modified"
+
+
+def test_save_load(tmp_path):
+    """Tests that a saved imputation loads back with the same state"""
+    df_num = pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": [2, 4, 6]})
+    df_mix = pd.DataFrame(
+        [[np.nan, 1, "c", True], ["d", np.nan, "f", True], ["d", 3, "c", 0]],
+        columns=["a", "b", 3, "d"],
+    )
+    df_mix["e"] = np.nan
+    for method, df in [("mean", df_num), ("most_frequent", df_mix)]:
+        imputer = imputation(method).fit(df)
+        path = tmp_path / f"{method}.ppy"
+        imputer.save(path)
+        loaded = imputation.load(path)
+        assert loaded.method == method
+        assert loaded.columns == imputer.columns
+        assert [type(c) for c in loaded.columns] == [
+            type(c) for c in imputer.columns
+        ]
+        assert pd.Series(loaded.values).equals(pd.Series(imputer.values))
+        assert loaded.fill(df).equals(imputer.fill(df))
+    with pytest.raises(ValueError):
+        imputation("mean").save(tmp_path / "unfitted.ppy")
+
+
+def test_knn():
+    """Tests knn imputation against hand computed neighbours"""
+    df = pd.DataFrame(
+        {
+            "a": [1.0, 2, 3, 10, 11, np.nan, np.nan],
+            "b": [1.0, 2, 3, 10, 11, 10.5, np.nan],
+            "c": [5.0, 6, 7, 50, 60, np.nan, np.nan],
+        }
+    )
+    imputer = imputation("knn", n_neighbors=2)
+    imputer.fit(df)
+    filled = imputer.fill(df)
+    assert filled.iloc[:5].equals(df.iloc[:5])
+    assert filled.iloc[5].tolist() == [10.5, 10.5, 55.0]
+    assert np.allclose(filled.iloc[6], df.mean())
+    assert imputer.fill_record({"a": None, "b": 2.5}) == {
+        "a": 2.5,
+        "b": 2.5,
+        "c": 6.5,
+    }
+    assert imputer.fill_record((np.nan, 10.4, np.nan)) == (10.5, 10.4, 55.0)
+    assert np.array_equal(
+        imputer.fill_records(np.array([[np.nan, 1.0, 5.0]])), [[1.5, 1, 5]]
+    )
+
+
+def test_knn_search():
+    """Tests that the tree and brute force searches find the neighbours
+    over the observed columns, with a bounded number of trees"""
+    rng = np.random.default_rng(0)
+    complete = rng.normal(size=(300, 4))
+    arr = rng.normal(size=(3000, 4))
+    arr[rng.random(arr.shape) < 0.3] = np.nan
+    imputer = imputation("knn", n_neighbors=3)
+    imputer.fit(pd.DataFrame(complete))
+    filled = imputer.fill(pd.DataFrame(arr)).to_numpy()
+    assert 0 < len(imputer._trees) <= KNN_TREES
+    # a few rows per missing pattern are searched by brute force
+    few = imputer.fill_records(arr[:10])
+    rows = np.vstack([arr, arr[:10]])
+    for row, result in zip(rows, np.vstack([filled, few])):
+        observed = ~np.isnan(row)
+        if not observed.any():
+            continue
+        distances = ((complete[:, observed] - row[observed]) ** 2).sum(1)
+        expected = complete[np.argsort(distances)[:3]].mean(axis=0)
+        assert np.allclose(result[~observed], expected[~observed])
+    imputer = imputation("knn", n_neighbors=3).fit(pd.DataFrame(complete))
+    record = arr[np.isnan(arr).any(axis=1)][0]
+    imputer.fill_record(record)
+    assert len(imputer._trees) == 0, "Small fits search records directly"
+
+
+def test_knn_search_large():
+    """Tests that records are searched through a reused tree when there
+    are too many complete rows to scan"""
+    rng = np.random.default_rng(0)
+    complete = rng.normal(size=(KNN_BRUTE_ROWS + 1000, 3))
+    imputer = imputation("knn", n_neighbors=2)
+    imputer.fit(pd.DataFrame(complete))
+    record = np.array([np.nan, 0.5, -0.5])
+    filled = imputer.fill_record(record)
+    assert len(imputer._trees) == 1, "A tree should be built"
+    tree = next(iter(imputer._trees.values()))
+    assert np.array_equal(imputer.fill_record(record), filled)
+    assert next(iter(imputer._trees.values())) is tree, "Tree is reused"
+    distances = ((complete[:, 1:] - record[1:]) ** 2).sum(axis=1)
+    expected = complete[np.argsort(distances)[:2], 0].mean()
+    assert filled[0] == pytest.approx(expected)
+
+
+def test_knn_errors(tmp_path):
+    """Tests knn input checks and save/load"""
+    with pytest.raises(TypeError):
+        imputation("knn").fit(pd.DataFrame([["a", 1.0]]))
+    with pytest.raises(ValueError):
+        imputation("knn").fit(pd.DataFrame([[np.nan, 1.0], [2.0, np.nan]]))
+    with pytest.raises(ValueError):
+        imputation("knn").partial_fit(pd.DataFrame([[1.0]]))
+    with pytest.raises(ValueError):
+        imputation("knn", n_neighbors=0)
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0], [np.nan, 3.9]])
+    imputer = imputation("knn", n_neighbors=1).fit(df)
+    imputer.save(tmp_path / "knn.ppy")
+    loaded = imputation.load(tmp_path / "knn.ppy")
+    assert loaded.n_neighbors == 1
+    assert loaded.fill(df).equals(imputer.fill(df))
+    assert loaded.fill(df).iloc[2, 0] == 3.0
+
+
+def test_strategy_map():
+    """Tests per-column methods and the dtype based default"""
+    df = pd.DataFrame(
+        {
+            "age": [20.0, np.nan, 40.0, 90.0],
+            "income": [1.0, 2.0, np.nan, 3.0],
+            "city": ["a", "b", "b", np.nan],
+        }
+    )
+    imputer = imputation({"age": "median"})
+    imputer.fit(df)
+    assert imputer.strategies == ["median", "mean", "most_frequent"]
+    assert imputer.values.tolist() == [40.0, 2.0, "b"]
+    filled = imputer.fill(df)
+    assert filled.isna().sum().sum() == 0
+    assert filled["city"].tolist() == ["a", "b", "b", "b"]
+    auto = imputation("auto").fit(df)
+    assert auto.strategies == ["mean", "mean", "most_frequent"]
+    stream = imputation({"age": "median"}).fit_stream([df.iloc[:2], df[2:]])
+    assert stream.values.tolist() == imputer.values.tolist()
+    with pytest.raises(TypeError):
+        imputation({"city": "mean"}).fit(df)
+    with pytest.raises(KeyError):
+        imputation({"city": "knn"})
+    with pytest.raises(KeyError):
+        imputation({"agee": "median"}).fit(df)
+    with pytest.raises(KeyError):
+        imputation({"agee": "median"}).partial_fit(df)
+
+
+def test_strategy_map_save_load(tmp_path):
+    """Tests that per-column methods survive save and load"""
+    df = pd.DataFrame({"a": [1.0, np.nan, 5.0], "b": ["x", "x", None]})
+    imputer = imputation({"a": "median"}).fit(df)
+    imputer.save(tmp_path / "map.ppy")
+    loaded = imputation.load(tmp_path / "map.ppy")
+    assert loaded.method == {"a": "median", "b": "most_frequent"}
+    assert loaded.fill(df).equals(imputer.fill(df))
@@ -0,0 +1,61 @@
+from prepropy.imputation import imputation
+from prepropy.pipeline import Pipeline
+from prepropy.scaler import Scaler
+import pytest
+import pandas as pd
+import numpy as np
+
+
+def gen_test_data():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "a": rng.normal(size=200),
+            "b": rng.integers(0, 5, size=200).astype(float),
+            "c": rng.choice(["x", "y", None], size=200),
+            "d": rng.normal(size=200),
+        }
+    )
+    df.loc[::5, "a"] = np.nan
+    df.loc[::7, "b"] = np.nan
+    df.loc[::3, "d"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize(
+    "scaler_type",
+    ["StandardScaler", "MinMaxScaler", "RobustScaler", "QuantileTransformer"],
+)
+def test_pipeline(scaler_type):
+    """Tests that the fused pipeline matches filling then scaling"""
+    df = gen_test_data()
+    pipe = Pipeline(imputation("auto"), Scaler(scaler_type))
+    pipe.fit(df, ["a", "b"])
+    filled = imputation("auto").fit(df).fill(df)
+    expected = Scaler(scaler_type).fit(filled, ["a", "b"]).transform(filled)
+    pd.testing.assert_frame_equal(pipe.transform(df), expected)
+    assert df["a"].isna().any()
+
+
+def test_pipeline_fitted():
+    """Tests composing fitted parts, sharing columns and streaming"""
+    df = gen_test_data()
+    imputer = imputation({"a": "median", "b": "mean"}).fit(df)
+    scaler = Scaler("MinMaxScaler", dtype=np.float32).fit(df, ["a"])
+    pipe = Pipeline(imputer, scaler)
+    out = pipe.transform(df, copy=False)
+    expected = scaler.transform(imputer.fill(df))
+    pd.testing.assert_frame_equal(out, expected)
+    assert not np.shares_memory(out["d"].to_numpy(), df["d"].to_numpy())
+    df_full = df.fillna(0)
+    shared = pipe.transform(df_full, copy=False)
+    assert np.shares_memory(shared["d"].to_numpy(), df_full["d"].to_numpy())
+    chunks = [df.iloc[:50], df.iloc[50:]]
+    streamed = pd.concat(pipe.transform_stream(chunks))
+    pd.testing.assert_frame_equal(streamed, expected)
+    with pytest.raises(TypeError):
+        pipe.transform(df[["a", "b"]])
+    with pytest.raises(ValueError):
+        Pipeline(imputation("knn"), scaler)
+    with pytest.raises(ValueError):
+        Pipeline(imputation("mean"), Scaler()).transform(df)
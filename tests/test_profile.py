@@ -0,0 +1,76 @@
+from prepropy.profile import Profile
+import pytest
+import pandas as pd
+import numpy as np
+
+
+def test_profile():
+    """Tests the single pass profile against pandas"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "b": rng.normal(size=1000),
+            "a": rng.integers(0, 10, size=1000),
+            "cat": rng.choice(["x", "y", None], size=1000),
+            "flag": rng.random(1000) > 0.5,
+            "nullable": pd.array(rng.integers(0, 5, size=1000), "Int64"),
+            "y": rng.choice([0, 1, 2], size=1000),
+        }
+    )
+    df.loc[::7, "b"] = np.nan
+    df.loc[::11, "nullable"] = pd.NA
+    profile = Profile("y", chunk_size=64).update(df)
+    assert profile.features == ["b", "a", "cat", "flag", "nullable"]
+    assert profile.num_features == ["b", "a", "nullable"]
+    assert profile.cat_features == ["cat", "flag"]
+    missing = df.drop(columns="y").isna().sum()
+    assert profile.missing.tolist() == missing.tolist()
+    summary = profile.summary()
+    numeric = ["b", "a", "nullable"]
+    expected = df[numeric].astype(float).describe()
+    for stat in ["count", "mean", "std", "min", "max"]:
+        assert np.allclose(
+            summary.loc[numeric, stat].astype(float), expected.loc[stat]
+        )
+    assert np.isnan(summary.loc["cat", "mean"])
+    assert profile.class_counts.equals(df["y"].value_counts())
+    merged = Profile("y").update(df.iloc[:300]).merge(
+        Profile("y").update(df.iloc[300:])
+    )
+    assert np.array_equal(merged.missing, profile.missing)
+    assert merged.class_counts.sort_index().equals(
+        profile.class_counts.sort_index()
+    )
+    assert np.allclose(merged.summary()["std"], summary["std"], equal_nan=True)
+    with pytest.raises(ValueError):
+        merged.update(df[["a", "b", "y"]])
+
+
+def test_profile_approximate():
+    """Tests the sketched distinct counts, top values and class counts"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "id": np.arange(5000),
+            "cat": rng.choice(["x", "y", "z", None], size=5000),
+            "y": rng.choice(["a", "b", None], size=5000, p=[0.6, 0.3, 0.1]),
+        }
+    )
+    profile = Profile("y", approximate=True, top_k=5)
+    profile.update(df.iloc[:2000]).merge(
+        Profile("y", approximate=True, top_k=5).update(df.iloc[2000:])
+    )
+    summary = profile.summary()
+    assert abs(summary.loc["id", "distinct"] / 5000 - 1) < 0.03
+    assert summary.loc["cat", "distinct"] == 3
+    top = profile.top_values()
+    expected = df["cat"].value_counts(dropna=False).to_dict()
+    assert top["cat"].to_dict() == expected
+    assert len(top["id"]) == 5
+    assert profile.n_classes() == 3
+    expected = df["y"].value_counts(dropna=False).to_dict()
+    assert profile.class_counts.to_dict() == expected
+    exact = Profile("y").update(df)
+    assert np.allclose(profile.class_ratio(), exact.class_ratio())
+    with pytest.raises(ValueError):
+        profile.merge(exact)
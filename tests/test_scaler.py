@@ -1,4 +1,4 @@
-from prepropy.scaler import scaler
+from prepropy.scaler import scaler, Scaler
 import pytest
 import pandas as pd
 import numpy as np
@@ -163,3 +163,279 @@ def test_minmax():
     assert np.array_equal(
         test_dict["X_test"].drop(columns=["name"]).to_numpy(), scaled_temp
     ), "Incorrect scaled test values"
+
+
+def test_Scaler_reuse():
+    """Tests that a fitted Scaler transforms new data like scaler()"""
+    for scaler_type in ["StandardScaler", "MinMaxScaler", "MaxAbsScaler"]:
+        expected = scaler(
+            X_train, X_Valid, X_test, ["age", "net_worth"], scaler_type
+        )
+        sc = Scaler(scaler_type).fit(X_train, ["age", "net_worth"])
+        assert sc.transform(X_test).equals(expected["X_test"])
+        assert sc.transform(X_Valid).equals(expected["X_Valid"])
+
+
+def test_Scaler_partial_fit():
+    """Tests that fitting in batches matches a single fit"""
+    for scaler_type in ["StandardScaler", "MinMaxScaler", "MaxAbsScaler"]:
+        for engine in ["numpy", "sklearn"]:
+            full = Scaler(scaler_type).fit(X_Valid, ["age", "net_worth"])
+            sc = Scaler(scaler_type, engine=engine)
+            sc.partial_fit(X_Valid.iloc[:2], ["age", "net_worth"])
+            sc.partial_fit(X_Valid.iloc[2:])
+            assert sc.n_samples_seen_ == 3
+            assert np.allclose(sc.center_, full.center_)
+            assert np.allclose(sc.scale_, full.scale_)
+
+
+def test_engines():
+    """Tests that the numpy engine matches scikit-learn"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.lognormal(size=(1000, 4)), columns=list("abcd"))
+    X.iloc[::7, 1] = np.nan
+    X["d"] = 3.0
+    for scaler_type in ["StandardScaler", "MinMaxScaler", "MaxAbsScaler"]:
+        native = Scaler(scaler_type, engine="numpy").fit(X, list("abcd"))
+        sk = Scaler(scaler_type, engine="sklearn").fit(X, list("abcd"))
+        assert np.allclose(native.center_, sk.center_)
+        assert np.allclose(native.scale_, sk.scale_)
+        out32 = Scaler(scaler_type, dtype=np.float32).fit(X, list("abcd"))
+        scaled32 = out32.transform(X)
+        assert (scaled32.dtypes == np.float32).all()
+        assert np.allclose(
+            scaled32.to_numpy(),
+            sk.transform(X).to_numpy(),
+            rtol=1e-5,
+            atol=1e-5,
+            equal_nan=True,
+        )
+
+
+def test_Scaler_save_load(tmp_path):
+    """Tests that a saved Scaler loads back with the same statistics"""
+    sc = Scaler("MinMaxScaler").fit(X_train, ["age", "net_worth"])
+    sc.save(tmp_path / "scaler.ppy")
+    loaded = Scaler.load(tmp_path / "scaler.ppy")
+    assert loaded.features == ["age", "net_worth"]
+    assert loaded.transform(X_test).equals(sc.transform(X_test))
+    loaded.partial_fit(X_test)
+    sc.partial_fit(X_test)
+    assert np.array_equal(loaded.scale_, sc.scale_)
+    sk = Scaler("MinMaxScaler", engine="sklearn").fit(X_train, ["age"])
+    sk.save(tmp_path / "sklearn.ppy")
+    with pytest.raises(ValueError):
+        Scaler.load(tmp_path / "sklearn.ppy").partial_fit(X_test)
+    with pytest.raises(ValueError):
+        Scaler().transform(X_test)
+    with pytest.raises(KeyError):
+        Scaler("spacescaler")
+
+
+def test_Scaler_save_load_options(tmp_path):
+    """Tests that coerce, n_quantiles and sketch_size are saved"""
+    X = pd.DataFrame({"a": ["1", "2", "x", "4"]})
+    sc = Scaler("RobustScaler", coerce=True, n_quantiles=50, sketch_size=64)
+    scaled = sc.fit(X, ["a"]).transform(X)
+    sc.save(tmp_path / "scaler.ppy")
+    loaded = Scaler.load(tmp_path / "scaler.ppy")
+    assert loaded.coerce
+    assert (loaded.n_quantiles, loaded.sketch_size) == (50, 64)
+    assert loaded.transform(X).equals(scaled)
+
+
+def test_numeric_validation():
+    """Tests that floats, negatives and numeric dtypes pass validation"""
+    X_str = pd.DataFrame({"a": ["-1.5", "2", "3.5"], "b": ["1e3", "0", "-2"]})
+    X_num = X_str.astype(float)
+    from_str = scaler(X_str, X_str, X_str, ["a", "b"])
+    from_num = scaler(X_num, X_num, X_num, ["a", "b"])
+    assert from_str["X_test"].equals(from_num["X_test"])
+    with pytest.raises(ValueError):
+        scaler(X_train, X_Valid, X_test_non_num, ["age", "net_worth"])
+
+
+def test_coerce():
+    """Tests that coerce turns non numeric values into nan"""
+    temp = scaler(
+        X_train,
+        X_Valid,
+        X_test_non_num,
+        ["age", "net_worth"],
+        scaler_type="MaxAbsScaler",
+        coerce=True,
+    )
+    assert np.isnan(temp["X_test"]["age"][1])
+    assert temp["X_test"]["age"][0] == 54 / 64
+
+
+def test_transform_copy():
+    """Tests that copy=False shares and inplace=True reuses the columns"""
+    X = pd.DataFrame(
+        {"a": [1.0, 2.0, 4.0], "b": [3, 1, 2], "c": ["x", "y", "z"]}
+    )
+    X["d"] = [0.5, 0.1, 0.2]
+    sc = Scaler().fit(X, ["a", "b"])
+    expected = sc.transform(X)
+    shared = sc.transform(X, copy=False)
+    assert shared.equals(expected)
+    assert np.shares_memory(shared["d"].to_numpy(), X["d"].to_numpy())
+    assert not np.shares_memory(expected["d"].to_numpy(), X["d"].to_numpy())
+    assert X["a"].tolist() == [1.0, 2.0, 4.0]
+    block = X["a"].to_numpy()
+    assert sc.transform(X, inplace=True) is X
+    assert X.equals(expected)
+    assert np.shares_memory(X["a"].to_numpy(), block)
+    temp = scaler(X_train, X_Valid, X_test, ["age", "net_worth"], copy=False)
+    assert temp["X_test"].equals(
+        scaler(X_train, X_Valid, X_test, ["age", "net_worth"])["X_test"]
+    )
+
+
+def test_stream(tmp_path):
+    """Tests that streamed chunks are scaled like the whole dataframe"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(100, 3)), columns=["a", "b", "c"])
+    X["name"] = "x"
+    X.to_csv(tmp_path / "train.csv", index=False)
+    sc = Scaler().fit_stream(
+        pd.read_csv(tmp_path / "train.csv", chunksize=30), ["a", "b"]
+    )
+    full = Scaler().fit(X, ["a", "b"])
+    assert sc.n_samples_seen_ == 100
+    assert np.allclose(sc.center_, full.center_)
+    assert np.allclose(sc.scale_, full.scale_)
+    chunks = sc.transform_stream(X.iloc[i:i + 25] for i in range(0, 100, 25))
+    assert pd.concat(chunks).equals(sc.transform(X))
+    n_rows = sc.transform_to_file(
+        pd.read_csv(tmp_path / "train.csv", chunksize=30),
+        tmp_path / "scaled.csv",
+        index=False,
+    )
+    assert n_rows == 100
+    scaled = pd.read_csv(tmp_path / "scaled.csv", float_precision="round_trip")
+    assert np.allclose(scaled.iloc[:, :3], sc.transform(X).iloc[:, :3])
+    assert (scaled["name"] == "x").all()
+    with pytest.raises(ValueError):
+        Scaler().fit_stream([], ["a"])
+
+
+def test_stream_parquet(tmp_path):
+    """Tests writing chunks whose inferred dtypes differ to parquet"""
+    pa = pytest.importorskip("pyarrow")
+    X = pd.DataFrame({"a": np.arange(8.0)})
+    X["count"] = pd.array([0, 1, 2, 3, 4, None, 6, 7], dtype="Int64")
+    X["name"] = [None] * 4 + ["x"] * 4
+    X.to_csv(tmp_path / "train.csv", index=False)
+    sc = Scaler().fit(X, ["a"])
+    # count is int in the first chunk and float in the second, name is
+    # missing from the whole first chunk
+    chunks = list(pd.read_csv(tmp_path / "train.csv", chunksize=4))
+    assert chunks[0]["count"].dtype != chunks[1]["count"].dtype
+    with pytest.raises(ValueError):
+        sc.transform_to_file(iter(chunks), tmp_path / "scaled.parquet")
+    schema = pa.schema(
+        [("a", pa.float64()), ("count", pa.int64()), ("name", pa.string())]
+    )
+    n_rows = sc.transform_to_file(
+        iter(chunks), tmp_path / "scaled.parquet", schema=schema
+    )
+    assert n_rows == 8
+    scaled = pd.read_parquet(tmp_path / "scaled.parquet")
+    assert np.allclose(scaled["a"], sc.transform(X)["a"])
+    assert scaled["count"].fillna(-1).tolist() == [0, 1, 2, 3, 4, -1, 6, 7]
+    assert scaled["name"].tolist() == [None] * 4 + ["x"] * 4
+    chunks = [chunk.drop(columns="name") for chunk in chunks]
+    sc = Scaler().fit(X.drop(columns="name"), ["a"])
+    sc.transform_to_file(iter(chunks), tmp_path / "inferred.parquet")
+    scaled = pd.read_parquet(tmp_path / "inferred.parquet")
+    assert scaled["count"].fillna(-1).tolist() == [0, 1, 2, 3, 4, -1, 6, 7]
+
+
+def test_fit_partitions(tmp_path):
+    """Tests that fitting partitions matches fitting all the rows"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.lognormal(size=(90, 3)), columns=["a", "b", "c"])
+    for i in range(3):
+        X.iloc[i * 30:(i + 1) * 30].to_csv(tmp_path / f"part-{i}.csv")
+    (tmp_path / "_SUCCESS").touch()
+    for scaler_type in ["StandardScaler", "MinMaxScaler", "MaxAbsScaler"]:
+        full = Scaler(scaler_type).fit(X, ["a", "b"])
+        for n_jobs in [None, 2]:
+            sc = Scaler(scaler_type).fit_partitions(
+                str(tmp_path), ["a", "b"], n_jobs=n_jobs
+            )
+            assert sc.n_samples_seen_ == 90
+            assert np.allclose(sc.center_, full.center_)
+            assert np.allclose(sc.scale_, full.scale_)
+        left = Scaler(scaler_type).fit(X.iloc[:40], ["a", "b"])
+        left.merge(Scaler(scaler_type).fit(X.iloc[40:], ["a", "b"]))
+        assert np.allclose(left.scale_, full.scale_)
+    with pytest.raises(ValueError):
+        left.merge(Scaler().fit(X, ["a", "c"]))
+    with pytest.raises(ValueError):
+        Scaler(engine="sklearn").fit_partitions([X], ["a"])
+
+
+def test_fit_partitions_parquet(tmp_path):
+    """Tests fitting parquet partitions, read for the features only"""
+    pytest.importorskip("pyarrow")
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.lognormal(size=(90, 3)), columns=["a", "b", "c"])
+    for i in range(3):
+        part = X.iloc[i * 30:(i + 1) * 30]
+        part.to_parquet(tmp_path / f"part-{i}.parquet")
+    full = Scaler("QuantileTransformer").fit(X, ["a", "b"])
+    for n_jobs in [None, 2]:
+        sc = Scaler("QuantileTransformer").fit_partitions(
+            str(tmp_path), ["a", "b"], n_jobs=n_jobs
+        )
+        assert sc.n_samples_seen_ == 90
+        scaled = sc.transform(X)[["a", "b"]]
+        assert np.allclose(scaled, full.transform(X)[["a", "b"]])
+
+
+def test_fit_partitions_sketch_size():
+    """Tests that partitions are sketched with the sketch_size asked for"""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.lognormal(size=3000)})
+    parts = [X.iloc[:1500], X.iloc[1500:]]
+    for n_jobs in [None, 2]:
+        sc = Scaler("RobustScaler", sketch_size=5000).fit_partitions(
+            parts, ["a"], n_jobs=n_jobs
+        )
+        # both partitions fit in the sketches, so the median is exact
+        assert sc.center_[0] == pytest.approx(X["a"].median())
+
+
+def test_sketch_scalers(tmp_path):
+    """Tests the RobustScaler and QuantileTransformer options"""
+    from sklearn import preprocessing
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.lognormal(size=(500, 2)), columns=["a", "b"])
+    X.iloc[::9, 1] = np.nan
+    for scaler_type in ["RobustScaler", "QuantileTransformer"]:
+        expected = getattr(preprocessing, scaler_type)().fit_transform(X)
+        sc = Scaler(scaler_type).fit(X, ["a", "b"])
+        assert np.allclose(
+            sc.transform(X).to_numpy(), expected, equal_nan=True
+        )
+        sc.save(tmp_path / "scaler.ppy")
+        loaded = Scaler.load(tmp_path / "scaler.ppy")
+        assert loaded.transform(X).equals(sc.transform(X))
+        with pytest.raises(ValueError):
+            Scaler(scaler_type, engine="sklearn")
+    big = pd.DataFrame({"a": rng.lognormal(size=100_000)})
+    sc = Scaler("RobustScaler", sketch_size=200)
+    for i in range(0, 100_000, 10_000):
+        sc.partial_fit(big.iloc[i:i + 10_000], ["a"])
+    q25, median, q75 = np.quantile(big["a"], [0.25, 0.5, 0.75])
+    assert sc.center_[0] == pytest.approx(median, rel=0.05)
+    assert sc.scale_[0] == pytest.approx(q75 - q25, rel=0.05)
+    scaled = Scaler("QuantileTransformer").fit(big, ["a"]).transform(big)
+    assert scaled["a"].between(0, 1).all()
+    assert scaled["a"].median() == pytest.approx(0.5, abs=0.01)
+    temp = scaler(X_train, X_Valid, X_test, ["age"], "RobustScaler")
+    # median 54 and interquartile range 59 - 49.5
+    assert np.allclose(temp["X_train"]["age"], [0, -9 / 9.5, 10 / 9.5])
@@ -0,0 +1,81 @@
+from prepropy.sketch import HyperLogLog, QuantileSketch, SpaceSaving
+import pytest
+import numpy as np
+import pandas as pd
+
+
+def test_quantile_exact():
+    """Tests that small inputs give exact quantiles"""
+    sketch = QuantileSketch()
+    sketch.update([4.0, np.nan, 1.0, 3.0, 2.0])
+    assert sketch.count == 4
+    assert sketch.quantile(0.5) == 2.5
+    assert np.array_equal(sketch.quantile([0, 1]), [1.0, 4.0])
+
+
+def test_quantile_error_bound():
+    """Tests the rank error and the memory bound on a large stream"""
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(size=500_000)
+    sketch = QuantileSketch(seed=0)
+    for chunk in np.array_split(data, 50):
+        sketch.update(chunk)
+    qs = np.array([0.01, 0.25, 0.5, 0.75, 0.99])
+    ranks = np.searchsorted(np.sort(data), sketch.quantile(qs)) / data.size
+    assert np.abs(ranks - qs).max() < 2 / sketch.k
+    assert sum(level.size for level in sketch.levels) <= 3 * sketch.k
+
+
+def test_merge():
+    """Tests that merged sketches estimate the quantiles of the union"""
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal(200_000)
+    left = QuantileSketch(seed=0).update(data[:100_000])
+    right = QuantileSketch(seed=1).update(data[100_000:])
+    left.merge(right)
+    assert left.count == data.size
+    rank = np.searchsorted(np.sort(data), left.quantile(0.5)) / data.size
+    assert abs(rank - 0.5) < 2 / left.k
+
+
+def test_empty():
+    """Tests that an empty sketch returns nan and k is validated"""
+    assert np.isnan(QuantileSketch().quantile(0.5))
+    with pytest.raises(ValueError):
+        QuantileSketch(k=1)
+
+
+def test_hyperloglog():
+    """Tests the distinct count error and that merging unions the values"""
+    rng = np.random.default_rng(0)
+    ids = rng.permutation(3_000_000)[:1_000_000]
+    left = HyperLogLog().update(ids[:600_000])
+    right = HyperLogLog().update(np.concatenate([ids[400_000:], ids[:10]]))
+    left.merge(right)
+    assert abs(left.count() / ids.size - 1) < 3 * 1.04 / np.sqrt(2 ** 14)
+    small = HyperLogLog().update(pd.Series([1, 2, 2.0, None, 3]))
+    assert small.count() == 3
+    assert HyperLogLog().count() == 0
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(p=10))
+
+
+def test_space_saving():
+    """Tests the heavy hitters and the count error bound of merged sketches"""
+    rng = np.random.default_rng(0)
+    data = rng.zipf(1.5, size=200_000).astype(float)
+    data[::100] = np.nan
+    left = SpaceSaving(k=50)
+    for chunk in np.array_split(data[:120_000], 10):
+        left.update(chunk)
+    left.merge(SpaceSaving(k=50).update(data[120_000:]))
+    assert left.n == data.size
+    assert len(left.counts) == 50
+    true = pd.Series(data).value_counts(dropna=False)
+    over = left.counts - true.reindex(left.counts.index)
+    assert (over >= 0).all()
+    assert (over <= left.errors).all()
+    assert left.errors.max() <= data.size / left.k
+    heavy = true[true > data.size / left.k].index
+    assert heavy.isin(left.counts.index).all()
+    assert left.counts.index[0] == 1.0
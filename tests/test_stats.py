@@ -0,0 +1,69 @@
+from prepropy.stats import ColumnQuantiles, CrossProducts, Moments
+import pytest
+import numpy as np
+import pandas as pd
+
+
+def test_update_merge():
+    """Tests that merged moments match a single pass"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(3, 2, size=(1000, 3))
+    X[::5, 1] = np.nan
+    X[:, 2] = np.nan
+    whole = Moments().update(X)
+    merged = Moments().update(X[:300]).merge(Moments().update(X[300:]))
+    merged.merge(Moments())
+    assert np.array_equal(merged.count, [1000, 800, 0])
+    assert np.allclose(merged.mean, whole.mean)
+    assert np.allclose(merged.var(), whole.var(), equal_nan=True)
+    assert np.allclose(merged.var()[:2], np.nanvar(X[:, :2], axis=0))
+    assert np.array_equal(merged.min[:2], np.nanmin(X[:, :2], axis=0))
+    assert np.array_equal(merged.absmax()[:2], np.nanmax(abs(X[:, :2]), 0))
+    copy = Moments.from_dict(merged.to_dict())
+    assert np.array_equal(copy.m2, merged.m2)
+    with pytest.raises(ValueError):
+        merged.merge(Moments().update(X[:, :2]))
+
+
+def test_column_quantiles():
+    """Tests that merged column sketches estimate each column's quantiles"""
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.normal(size=50_000), rng.uniform(size=50_000)])
+    merged = ColumnQuantiles().update(X[:20_000])
+    merged.merge(ColumnQuantiles().update(X[20_000:]))
+    assert np.array_equal(merged.count, [50_000, 50_000])
+    q = merged.quantile([0.1, 0.5, 0.9])
+    assert q.shape == (3, 2)
+    assert np.allclose(q, np.quantile(X, [0.1, 0.5, 0.9], axis=0), atol=0.05)
+    exact = ColumnQuantiles().update(X[:100])
+    assert np.allclose(exact.quantile(0.5), np.median(X[:100], axis=0))
+
+
+def test_cross_products():
+    """Tests that merged cross-products give the pairwise correlations"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(1000, 2, size=(3000, 5))
+    X[:, 1] += X[:, 0]
+    X[::7, 2] = np.nan
+    X[::3, 3] = np.nan
+    X[:, 4] = 5
+    merged = CrossProducts().update(X[:1000])
+    merged.merge(CrossProducts().update(X[1000:])).merge(CrossProducts())
+    expected = pd.DataFrame(X)
+    assert np.allclose(merged.count[2, 3], 3000 - 429 - 1000 + 143)
+    assert np.allclose(
+        merged.corr(), expected.corr(), atol=1e-10, equal_nan=True
+    )
+    assert np.allclose(merged.cov(), expected.cov(), equal_nan=True)
+    copy = CrossProducts.from_dict(merged.to_dict())
+    assert np.array_equal(copy.products, merged.products)
+    # few missing values go through the sparse mask
+    X[np.isnan(X)] = 1000.0
+    X[::50, 2] = np.nan
+    sparse = CrossProducts().update(X[:1000])
+    sparse.merge(CrossProducts().update(X[1000:]))
+    assert np.allclose(
+        sparse.corr(), pd.DataFrame(X).corr(), atol=1e-10, equal_nan=True
+    )
+    with pytest.raises(ValueError):
+        merged.update(X[:, :2])